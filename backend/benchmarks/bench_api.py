@@ -0,0 +1,274 @@
+# Benchmark API według scenariuszy: aplikacja uruchamiana w procesie (klient testowy Flask)
+# na wskazanej bazie (domyślnie tymczasowa SQLite), schemat z migracji, syntetyczne dane.
+# Dla każdego scenariusza: percentyle opóźnień p50/p95/p99, przepustowość i liczba zapytań
+# SQL na żądanie (z nagłówka Server-Timing). Wynik w JSON - do porównywania między commitami.
+#
+#   python benchmarks/bench_api.py --members 20000 --requests 500 --output wynik.json
+#   python benchmarks/bench_api.py --compare wynik.json            # zmiana względem poprzedniego wyniku
+#   python benchmarks/bench_api.py --db "$DATABASE_URL" --scenarios list,detail
+#
+import argparse
+import datetime
+import io
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import config  # noqa: E402
+from flask_migrate import upgrade  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import Member, User, create_app, db, init_migrations  # noqa: E402
+from synthetic import STATUSES, seed_documents, seed_members  # noqa: E402
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+LOGIN_USERS = 20
+PASSWORD = 'benchmark-haslo'
+
+
+class Recorder:
+    # Próbki (czas, kod odpowiedzi, liczba zapytań) z wielu wątków - list.append jest atomowe
+    def __init__(self):
+        self.samples = []
+
+    def call(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        response = method(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        match = SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+        self.samples.append((elapsed, response.status_code, int(match.group(1)) if match else None))
+        return response
+
+
+def login_storm(context, recorder, rng):
+    email = f"bench{rng.randrange(LOGIN_USERS)}@example.org"
+    recorder.call(context['client'].post, '/api/auth/login', json={'email': email, 'password': PASSWORD})
+
+
+def list_paging(context, recorder, rng):
+    client, headers = context['client'], context['headers']
+    if rng.random() < 0.5:
+        page = rng.randint(1, max(1, context['members'] // 20))
+        recorder.call(client.get, f"/api/members?page={page}&limit=20", headers=headers)
+    else:
+        recorder.call(client.get, f"/api/members?status={rng.choice(STATUSES)}&pagination=cursor&limit=20", headers=headers)
+
+
+def search_paging(context, recorder, rng):
+    term = f"Nazwisko{rng.randint(1, context['members'])}"[:rng.randint(9, 11)]
+    recorder.call(context['client'].get, f"/api/members?search={term}&page={rng.randint(1, 3)}&limit=20", headers=context['headers'])
+
+
+def detail_documents(context, recorder, rng):
+    client, headers = context['client'], context['headers']
+    member_id = rng.randint(1, context['members'])
+    recorder.call(client.get, f"/api/members/{member_id}", headers=headers)
+    recorder.call(client.get, f"/api/members/{member_id}/documents", headers=headers)
+
+
+def bulk_create(context, recorder, rng):
+    batch = next(context['sequence'])
+    body = ''.join(
+        json.dumps({'first_name': f"Nowy{batch}", 'last_name': f"Import{number}", 'email': f"import{batch}.{number}@example.org"}) + '\n'
+        for number in range(context['bulk_size'])
+    )
+    recorder.call(context['client'].post, '/api/members/bulk', data=body, content_type='application/x-ndjson', headers=context['headers'])
+
+
+def upload_download(context, recorder, rng):
+    client, headers = context['client'], context['headers']
+    member_id = rng.randint(1, context['members'])
+    content = os.urandom(context['upload_size'])
+    response = recorder.call(
+        client.post, f"/api/members/{member_id}/documents", headers=headers,
+        data={'file': (io.BytesIO(content), 'benchmark.bin'), 'document_type': 'Inny'}, content_type='multipart/form-data'
+    )
+    document_id = (response.get_json(silent=True) or {}).get('document_id')
+    if document_id:
+        recorder.call(client.get, f"/api/documents/{document_id}/download", headers=headers)
+
+
+SCENARIOS = {
+    'login': login_storm,
+    'list': list_paging,
+    'search': search_paging,
+    'detail': detail_documents,
+    'bulk_create': bulk_create,
+    'upload_download': upload_download,
+}
+
+
+def percentile(values, fraction):
+    # Metoda najbliższej rangi na posortowanej liście
+    return values[max(0, min(len(values) - 1, int(round(fraction * len(values))) - 1))]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'max': round(latencies[-1], 2),
+        } if latencies else None,
+        'queries_per_request': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        } if queries else None,
+    }
+
+
+def run_scenario(context, scenario, iterations, concurrency, seed):
+    recorder = Recorder()
+
+    def worker(number):
+        # Osobny klient testowy na wątek (własne ciasteczka i kontekst)
+        local = dict(context, client=context['app'].test_client())
+        rng = random.Random(seed * 1000 + number)
+        for _ in range(iterations // concurrency + (1 if number < iterations % concurrency else 0)):
+            scenario(local, recorder, rng)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return summarize(recorder.samples, time.perf_counter() - started)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare(app, args):
+    init_migrations(app)
+    upgrade()
+    if Member.query.first() is not None:
+        print('Baza zawiera już dane - pomijam generowanie', file=sys.stderr)
+    else:
+        started = time.perf_counter()
+        seed_members(args.members)
+        seed_documents(args.members, args.documents_per_member)
+        app.test_cli_runner().invoke(args=['stats-rebuild'])
+        print(f"Seed {args.members} członków: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    if User.query.filter_by(email='bench0@example.org').first() is None:
+        # Jeden skrót dla wszystkich kont - koszt haszowania ponoszą logowania, nie przygotowanie
+        password = generate_password_hash(PASSWORD, method=app.config['PASSWORD_HASH_METHOD'])
+        db.session.add_all(
+            User(username=f"bench{number}", email=f"bench{number}@example.org", password=password, role='admin')
+            for number in range(LOGIN_USERS)
+        )
+        db.session.commit()
+
+
+def compare(previous, current):
+    print(f"{'scenariusz':<16} {'p95 [ms]':>20} {'req/s':>20}", file=sys.stderr)
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before or not before.get('latency_ms') or not result.get('latency_ms'):
+            continue
+        p95_before, p95_now = before['latency_ms']['p95'], result['latency_ms']['p95']
+        rps_before, rps_now = before['throughput_rps'], result['throughput_rps']
+        print(f"{name:<16} {p95_before:>7.1f} -> {p95_now:>7.1f} {(p95_now / p95_before - 1) * 100:>+4.0f}% "
+              f"{rps_before:>7.1f} -> {rps_now:>7.1f} {(rps_now / rps_before - 1) * 100:>+4.0f}%", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API według scenariuszy (opóźnienia, przepustowość, zapytania SQL)')
+    parser.add_argument('--db', default='', help='Adres bazy (SQLAlchemy); domyślnie nowa tymczasowa baza SQLite')
+    parser.add_argument('--members', type=int, default=10000)
+    parser.add_argument('--documents-per-member', type=int, default=1)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Lista scenariuszy: {', '.join(SCENARIOS)}")
+    parser.add_argument('--requests', type=int, default=300, help='Liczba iteracji każdego scenariusza')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--bulk-size', type=int, default=50, help='Członków w jednym imporcie (bulk_create)')
+    parser.add_argument('--upload-size', type=int, default=64 * 1024, help='Rozmiar przesyłanego pliku w bajtach')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='', help='Plik wyniku JSON (domyślnie standardowe wyjście)')
+    parser.add_argument('--compare', default='', help='Poprzedni wynik JSON do porównania')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Nieznane scenariusze: {', '.join(unknown)}")
+
+    database_url = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_api.db')}"
+    engine_options = config.engine_options(database_url)
+    if database_url.startswith('sqlite'):
+        # Zapisy z wielu wątków czekają na blokadę pliku zamiast kończyć się błędem
+        engine_options = {'connect_args': {'timeout': 30}}
+
+    class BenchConfig(config.Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options
+        UPLOAD_FOLDER = tempfile.mkdtemp()
+        STORAGE_LOCAL_ROOT = ''
+        # Wszystkie żądania przychodzą z jednego adresu - limit prób logowania zafałszowałby wynik
+        LOGIN_IP_LIMIT = 10 ** 9
+        # Zapisy z wielu wątków do SQLite czekają na blokadę - dziennik wolnych zapytań tylko zaśmieca wynik
+        SLOW_QUERY_MS = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        prepare(app, args)
+        members = Member.query.count()
+        token = app.test_client().post('/api/auth/login', json={'email': 'bench0@example.org', 'password': PASSWORD}).get_json()['token']
+
+    context = {
+        'app': app,
+        'headers': {'Authorization': f"Bearer {token}"},
+        'members': members,
+        'sequence': itertools.count(int(time.time())),
+        'bulk_size': args.bulk_size,
+        'upload_size': args.upload_size,
+    }
+
+    result = {
+        'revision': git_revision(),
+        'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
+        'database': database_url.split(':', 1)[0],
+        'members': members,
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'scenarios': {},
+    }
+    print(f"{'scenariusz':<16} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'zapytań':>8} {'błędy':>6}", file=sys.stderr)
+    for name in names:
+        summary = run_scenario(context, SCENARIOS[name], args.requests, args.concurrency, args.seed)
+        result['scenarios'][name] = summary
+        latency = summary['latency_ms'] or {'p50': 0, 'p95': 0, 'p99': 0}
+        queries = summary['queries_per_request']['mean'] if summary['queries_per_request'] else 0
+        print(f"{name:<16} {summary['throughput_rps'] or 0:>8.1f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+              f"{latency['p99']:>8.1f} {queries:>8.1f} {summary['errors']:>6}", file=sys.stderr)
+
+    app.extensions['job_runner'].stop()
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            target.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            compare(json.load(source), result)
+
+
+if __name__ == '__main__':
+    main()
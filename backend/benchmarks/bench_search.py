@@ -0,0 +1,119 @@
+# Porównanie wyszukiwania ILIKE '%fraza%' z indeksem n-gramów na syntetycznych danych.
+#
+#   python benchmarks/bench_search.py --members 1000000 --db sqlite:///bench_search.db
+#
+import argparse
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, func, insert, or_, select
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from search import NgramIndex  # noqa: E402
+
+FIRST_NAMES = ['Anna', 'Piotr', 'Krzysztof', 'Maria', 'Tomasz', 'Katarzyna', 'Paweł', 'Agnieszka',
+               'Michał', 'Magdalena', 'Marcin', 'Joanna', 'Jakub', 'Ewa', 'Adam', 'Zofia']
+LAST_NAMES = ['Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk', 'Kamiński', 'Lewandowski',
+              'Zieliński', 'Szymański', 'Woźniak', 'Dąbrowski', 'Kozłowski', 'Jankowski', 'Mazur']
+STATUSES = ['Aktywny', 'Oczekujący', 'Zawieszony', 'Wygasły', 'Nieaktywny']
+TERMS = ['nowak', 'kowal', 'anna.w', 'mazur12', 'zieli', 'xyz-brak']
+
+metadata = MetaData()
+member = Table(
+    'member', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('first_name', String(50)),
+    Column('last_name', String(50)),
+    Column('email', String(100)),
+    Column('status', String(20)),
+)
+
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    for member_id in range(1, count + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        yield {
+            'id': member_id,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f"{first_name}.{last_name}{member_id}@example.org".lower(),
+            'status': rng.choice(STATUSES),
+        }
+
+
+def seed(engine, count, batch_size=50000):
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    batch = []
+    with engine.begin() as connection:
+        for row in synthetic_rows(count):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.execute(insert(member), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(member), batch)
+
+
+def ilike_search(connection, term, limit):
+    pattern = f"%{term}%"
+    condition = or_(member.c.first_name.ilike(pattern), member.c.last_name.ilike(pattern), member.c.email.ilike(pattern))
+    total = connection.execute(select(func.count()).select_from(member).where(condition)).scalar()
+    rows = connection.execute(select(member.c.id).where(condition).order_by(member.c.id.desc()).limit(limit)).all()
+    return total, [row[0] for row in rows]
+
+
+def ngram_search(index, term, limit):
+    ids = index.search(term)
+    return len(ids), ids[:limit]
+
+
+def timed(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wyszukiwania członków: ILIKE vs indeks n-gramów')
+    parser.add_argument('--members', type=int, default=1000000)
+    parser.add_argument('--db', default='sqlite:///bench_search.db')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-seed', action='store_true')
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(engine, args.members)
+        print(f"Seed {args.members} członków: {time.perf_counter() - started:.1f}s")
+
+    index = NgramIndex()
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        for row in connection.execute(select(member)).yield_per(10000):
+            index.add(row.id, (row.first_name, row.last_name, row.email), row.status)
+    print(f"Budowa indeksu n-gramów ({len(index)} dokumentów): {time.perf_counter() - started:.1f}s")
+
+    print(f"{'fraza':<12} {'wyniki':>9} {'ilike [ms]':>12} {'ngram [ms]':>12} {'przyspieszenie':>15}")
+    with engine.connect() as connection:
+        for term in TERMS:
+            ilike_time, (ilike_total, _) = timed(lambda: ilike_search(connection, term, args.limit), args.repeat)
+            ngram_time, (ngram_total, _) = timed(lambda: ngram_search(index, term, args.limit), args.repeat)
+            if ilike_total != ngram_total:
+                print(f"UWAGA: różna liczba wyników dla '{term}': ilike={ilike_total}, ngram={ngram_total}")
+            speedup = ilike_time / ngram_time if ngram_time else float('inf')
+            print(f"{term:<12} {ilike_total:>9} {ilike_time * 1000:>12.1f} {ngram_time * 1000:>12.1f} {speedup:>14.1f}x")
+
+
+if __name__ == '__main__':
+    main()
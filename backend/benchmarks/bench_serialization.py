@@ -0,0 +1,87 @@
+# Porównanie serializacji strony listy członków: obiekty ORM + jsonify
+# z krotkami kolumn + szybki koder (orjson/json, opcjonalnie MessagePack i gzip).
+#
+#   python benchmarks/bench_serialization.py --members 20000 --limit 1000
+#
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import config  # noqa: E402
+from app import Member, create_app, db, serialize_member  # noqa: E402
+from serialization import MEMBER_FIELDS, SUMMARY_FIELDS, encode, msgpack_module, orjson, rows_to_dicts, select_columns  # noqa: E402
+from synthetic import seed_members  # noqa: E402
+
+
+def orm_jsonify(app, limit, fields):
+    members = Member.query.order_by(Member.created_at.desc(), Member.id.desc()).limit(limit).all()
+    result = []
+    for member in members:
+        data = serialize_member(member)
+        result.append({field: data[field] for field in fields})
+    db.session.expunge_all()
+    return app.json.response({'members': result}).get_data()
+
+
+def rows_encoded(limit, fields, fmt='json'):
+    names, columns = select_columns(Member, fields)
+    rows = db.session.query(*columns).order_by(Member.created_at.desc(), Member.id.desc()).limit(limit).all()
+    return encode({'members': rows_to_dicts(rows, names, fields)}, fmt)
+
+
+def timed(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serializacji listy członków: ORM + jsonify vs krotki + szybki koder')
+    parser.add_argument('--members', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_serialization.db')
+
+    class BenchConfig(config.Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        UPLOAD_FOLDER = tempfile.mkdtemp()
+        SEARCH_BACKEND = 'ilike'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        seed_members(args.members)
+        print(f"Seed {args.members} członków: {time.perf_counter() - started:.1f}s")
+        print(f"Koder JSON: {'orjson' if orjson is not None else 'json (stdlib)'}, "
+              f"MessagePack: {'tak' if msgpack_module() is not None else 'brak'}")
+
+        print(f"{'wariant':<34} {'czas [ms]':>10} {'rozmiar [B]':>12} {'gzip [B]':>10} {'przyspieszenie':>15}")
+        for label, fields in (('podsumowanie', SUMMARY_FIELDS), ('wszystkie pola', MEMBER_FIELDS), ('fields=id,email', ['id', 'email'])):
+            with app.test_request_context():
+                baseline, body = timed(lambda: orm_jsonify(app, args.limit, fields), args.repeat)
+                variants = [(f"{label}: ORM + jsonify", baseline, body)]
+                elapsed, body = timed(lambda: rows_encoded(args.limit, fields), args.repeat)
+                variants.append((f"{label}: krotki + koder", elapsed, body))
+                if msgpack_module() is not None:
+                    elapsed, body = timed(lambda: rows_encoded(args.limit, fields, 'msgpack'), args.repeat)
+                    variants.append((f"{label}: krotki + msgpack", elapsed, body))
+
+            for name, elapsed, body in variants:
+                compressed = len(gzip.compress(body, compresslevel=6))
+                print(f"{name:<34} {elapsed * 1000:>10.1f} {len(body):>12} {compressed:>10} {baseline / elapsed:>14.1f}x")
+
+
+if __name__ == '__main__':
+    main()
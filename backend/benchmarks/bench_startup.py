@@ -0,0 +1,207 @@
+# Benchmark startu aplikacji: czas importu modułów (python -X importtime) i czas do pierwszego
+# żądania - w nowym interpreterze (import app, create_app, GET /healthz/live przez klienta
+# testowego) oraz opcjonalnie dla serwera gunicorn (od uruchomienia do pierwszej odpowiedzi).
+# Każdy pomiar w osobnym procesie, wynik to mediana z --repeat powtórzeń. Wynik w JSON - do
+# porównywania między commitami.
+#
+#   python benchmarks/bench_startup.py --output przed.json
+#   python benchmarks/bench_startup.py --gunicorn --compare przed.json
+#
+import argparse
+import datetime
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Linie wyjścia -X importtime: "import time: self [us] | cumulative | nazwa" (wcięcie = głębokość)
+IMPORT_TIME_LINE = 'import time:'
+
+FIRST_REQUEST = '''
+import json, time
+started = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.create_app()
+created = time.perf_counter()
+status = application.test_client().get('/healthz/live').status_code
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (finished - created) * 1000,
+    'status': status,
+}))
+'''
+
+# Połączenia bezpośrednie z lokalnym serwerem, z pominięciem proxy ze zmiennych środowiskowych
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_importtime(output):
+    # {moduł: (czas własny, czas łączny)} w ms i moduły importowane bezpośrednio przez app
+    modules = {}
+    pending = []
+    direct = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_TIME_LINE) or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len(IMPORT_TIME_LINE):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        modules[name] = (int(own) / 1000, int(cumulative) / 1000)
+        # Moduł jest wypisywany po swoich zależnościach: wpisy o głębokości 1 przed "app" to jego importy
+        if depth == 0:
+            if name == 'app':
+                direct = pending
+            pending = []
+        elif depth == 1:
+            pending.append(name)
+    return modules, direct
+
+
+def measure_imports(env, repeat):
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND_DIR, env=env,
+                                   capture_output=True, text=True, check=True)
+        runs.append(parse_importtime(completed.stderr))
+    direct = runs[0][1]
+    return {
+        'total_ms': round(statistics.median(modules['app'][1] for modules, _ in runs), 1),
+        'app_own_ms': round(statistics.median(modules['app'][0] for modules, _ in runs), 1),
+        'modules_ms': {
+            name: round(statistics.median(modules.get(name, (0, 0))[1] for modules, _ in runs), 1)
+            for name in direct
+        },
+    }
+
+
+def measure_first_request(env, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', FIRST_REQUEST], cwd=BACKEND_DIR, env=env,
+                                   capture_output=True, text=True, check=True)
+        # Czas od uruchomienia interpretera, razem z jego startem i zakończeniem
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        sample['process_ms'] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+    return {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ('process_ms', 'import_ms', 'create_app_ms', 'first_request_ms')
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_gunicorn(env, repeat, timeout=60):
+    samples = []
+    for _ in range(repeat):
+        port = free_port()
+        server_env = {**env, 'BIND': f"127.0.0.1:{port}", 'WEB_CONCURRENCY': '1', 'GUNICORN_ACCESS_LOG': ''}
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], cwd=BACKEND_DIR,
+                                   env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                if time.perf_counter() - started > timeout or process.poll() is not None:
+                    raise RuntimeError('Serwer gunicorn nie odpowiedział')
+                try:
+                    with opener.open(f"http://127.0.0.1:{port}/healthz/live", timeout=1) as response:
+                        if response.status == 200:
+                            break
+                except OSError:
+                    time.sleep(0.01)
+            samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return {'first_response_ms': round(statistics.median(samples), 1)}
+
+
+def compare(previous, current):
+    rows = [
+        ('import app', ('imports', 'total_ms')),
+        ('proces do 1. żądania', ('first_request', 'process_ms')),
+        ('  import', ('first_request', 'import_ms')),
+        ('  create_app', ('first_request', 'create_app_ms')),
+        ('  pierwsze żądanie', ('first_request', 'first_request_ms')),
+        ('gunicorn do 1. odp.', ('gunicorn', 'first_response_ms')),
+    ]
+    print(f"{'pomiar':<22} {'ms':>22}", file=sys.stderr)
+    for label, (section, key) in rows:
+        before = (previous.get(section) or {}).get(key)
+        now = (current.get(section) or {}).get(key)
+        if not before or not now:
+            continue
+        print(f"{label:<22} {before:>8.1f} -> {now:>8.1f} {(now / before - 1) * 100:>+4.0f}%", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark startu aplikacji (czas importu i czas do pierwszego żądania)')
+    parser.add_argument('--db', default='', help='Adres bazy (SQLAlchemy); domyślnie tymczasowa baza SQLite')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='Liczba najwolniejszych importów w podsumowaniu')
+    parser.add_argument('--gunicorn', action='store_true', help='Zmierz też start serwera gunicorn (1 proces)')
+    parser.add_argument('--output', default='', help='Plik wyniku JSON (domyślnie standardowe wyjście)')
+    parser.add_argument('--compare', default='', help='Poprzedni wynik JSON do porównania')
+    args = parser.parse_args()
+
+    # Baza nie musi zawierać schematu - start aplikacji nie wykonuje zapytań
+    env = {**os.environ, 'DATABASE_URL': args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}"}
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+
+    result = {
+        'revision': git_revision(),
+        'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'imports': measure_imports(env, args.repeat),
+        'first_request': measure_first_request(env, args.repeat),
+        'gunicorn': measure_gunicorn(env, args.repeat) if args.gunicorn else None,
+    }
+
+    imports = result['imports']
+    print(f"import app: {imports['total_ms']:.1f} ms (własny kod modułu {imports['app_own_ms']:.1f} ms)", file=sys.stderr)
+    for name, elapsed in sorted(imports['modules_ms'].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {elapsed:>8.1f} ms", file=sys.stderr)
+    first = result['first_request']
+    print(f"proces do pierwszego żądania: {first['process_ms']:.1f} ms (import {first['import_ms']:.1f}, "
+          f"create_app {first['create_app_ms']:.1f}, żądanie {first['first_request_ms']:.1f})", file=sys.stderr)
+    if result['gunicorn']:
+        print(f"gunicorn do pierwszej odpowiedzi: {result['gunicorn']['first_response_ms']:.1f} ms", file=sys.stderr)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            target.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            compare(json.load(source), result)
+
+
+if __name__ == '__main__':
+    main()
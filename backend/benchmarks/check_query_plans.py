@@ -0,0 +1,181 @@
+# Kontrola planów zapytań gorących ścieżek API. Schemat powstaje z migracji (flask db upgrade),
+# baza SQLite jest wypełniana syntetycznymi danymi, a każdy scenariusz wykonuje żądanie przez
+# klienta testowego. Każde przechwycone zapytanie SELECT przechodzi przez EXPLAIN QUERY PLAN;
+# pełny skan tabeli (SCAN tabela bez indeksu) lub sortowanie bez indeksu (USE TEMP B-TREE
+# FOR ORDER BY) kończy kontrolę kodem 1 - do uruchamiania w CI po zmianie zapytań lub indeksów.
+#
+#   python benchmarks/check_query_plans.py --members 100000 --documents-per-member 2
+#
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import config  # noqa: E402
+from flask_migrate import upgrade  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import Document, Member, MemberChange, User, create_app, db, encode_cursor, init_migrations  # noqa: E402
+from change_feed import record_changes  # noqa: E402
+from storage import derived_key, save_bytes  # noqa: E402
+from synthetic import STATUSES, seed_documents, seed_members  # noqa: E402
+
+# SQLite >= 3.36: "SCAN member", starsze wersje: "SCAN TABLE member"
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+# Tabele o ograniczonym rozmiarze (liczniki statystyk) - pełny odczyt jest zamierzony
+SMALL_TABLES = {'member_stat'}
+
+
+def plan_problems(plan):
+    problems = []
+    for detail in plan:
+        match = FULL_SCAN.match(detail)
+        if match and match.group(1) not in SMALL_TABLES:
+            problems.append(f"pełny skan tabeli {match.group(1)}")
+        elif detail.startswith(TEMP_SORT):
+            problems.append('sortowanie bez indeksu')
+    return problems
+
+
+def explain(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def scenarios(app, client, token):
+    member = db.session.get(Member, Member.query.count() // 2)
+    document = Document.query.filter_by(member_id=member.id).first()
+    # Pliki pobieranego dokumentu i jego miniatury (pozostałe istnieją tylko w bazie)
+    storage = app.extensions['storage']
+    save_bytes(storage, b'%PDF-1.4\n', document.storage_key)
+    save_bytes(storage, b'\x89PNG\r\n', derived_key(document.storage_key, 'thumb.png'))
+    # Wpisy dziennika zmian sprzed startu odczytu - since=0 czyta z bazy, a nie z pamięci procesu
+    record_changes(db.session.connection(), MemberChange.__table__, [{'action': 'updated', 'member_id': member.id + offset} for offset in range(100)])
+    db.session.commit()
+    cursor = encode_cursor(member.created_at, member.id)
+    ids = ','.join(str(member.id + offset) for offset in range(0, 200, 7))
+    headers = {'Authorization': f"Bearer {token}"}
+    status = STATUSES[2]
+
+    def get(path):
+        return lambda: client.get(path, headers=headers).status_code
+
+    def claim_job():
+        app.extensions['job_runner'].claim()
+        return 200
+
+    def delete_member():
+        return client.delete(f"/api/members/{member.id + 1000}", headers=headers).status_code
+
+    def purge():
+        app.extensions['member_purge'].run()
+        return 200
+
+    def login():
+        return client.post('/api/auth/login', json={'email': 'plany@example.org', 'password': 'plany'}).status_code
+
+    return [
+        ('logowanie', login),
+        ('lista członków', get('/api/members?page=1&limit=20')),
+        ('lista członków - dalsza strona', get('/api/members?page=200&limit=20&count=none')),
+        ('lista z filtrem statusu', get(f"/api/members?status={status}&limit=20")),
+        ('wybrane pola', get('/api/members?fields=id,email,status&limit=100')),
+        ('kursor - pierwsza strona', get('/api/members?pagination=cursor&limit=50')),
+        ('kursor - kolejna strona', get(f"/api/members?after={cursor}&limit=50")),
+        ('kursor z filtrem statusu i liczbą', get(f"/api/members?after={cursor}&status={status}&count=exact&limit=50")),
+        ('odczyt wsadowy z dokumentami', get(f"/api/members?ids={ids}&include=documents")),
+        ('członek', get(f"/api/members/{member.id}")),
+        ('dokumenty członka', get(f"/api/members/{member.id}/documents")),
+        ('pobranie dokumentu', get(f"/api/documents/{document.id}/download")),
+        ('miniatura dokumentu', get(f"/api/documents/{document.id}/thumbnail")),
+        ('statystyki', get('/api/stats')),
+        ('dziennik zmian', get('/api/changes?since=0&timeout=0')),
+        ('kolejka zadań', claim_job),
+        ('usunięcie członka', delete_member),
+        ('usuwanie w tle', purge),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kontrola planów zapytań (EXPLAIN QUERY PLAN) dla gorących ścieżek API')
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--documents-per-member', type=int, default=2)
+    parser.add_argument('--verbose', action='store_true', help='Wypisz zapytania i plany wszystkich scenariuszy')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+
+    class PlanConfig(config.Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        UPLOAD_FOLDER = tempfile.mkdtemp()
+        STORAGE_BACKEND = 'local'
+        STORAGE_LOCAL_ROOT = ''
+        SEARCH_BACKEND = 'ilike'
+        RESPONSE_CACHE_BACKEND = 'none'
+        JOB_WORKERS = 0
+        MEMBER_PURGE_DELAY = 0  # scenariusz usuwania w tle zaraz po usunięciu członka
+
+    app = create_app(PlanConfig)
+    init_migrations(app)
+    with app.app_context():
+        upgrade()
+        started = time.perf_counter()
+        seed_members(args.members)
+        documents = seed_documents(args.members, args.documents_per_member)
+        db.session.add(User(username='plany', email='plany@example.org', password=generate_password_hash('plany'), role='admin'))
+        db.session.commit()
+        app.test_cli_runner().invoke(args=['stats-rebuild'])
+        # Statystyki rozkładu dla planisty, jak w bazie produkcyjnej po ANALYZE
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        print(f"Seed {args.members} członków, {documents} dokumentów: {time.perf_counter() - started:.1f}s")
+
+        client = app.test_client()
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        response = client.post('/api/auth/login', json={'email': 'plany@example.org', 'password': 'plany'})
+        token = response.get_json()['token']
+        checks = scenarios(app, client, token)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+
+        failures = 0
+        for name, run in checks:
+            captured.clear()
+            status_code = run()
+            statements = list(dict.fromkeys(captured))
+            report = []
+            for statement, parameters in statements:
+                plan = explain(statement, parameters)
+                problems = plan_problems(plan)
+                report.append((statement, plan, problems))
+
+            failed = [entry for entry in report if entry[2]]
+            failures += len(failed)
+            print(f"{'BŁĄD' if failed else 'OK':<5} {name} (HTTP {status_code}, zapytań: {len(statements)})")
+            for statement, plan, problems in report:
+                if problems or args.verbose:
+                    print(f"      {' '.join(statement.split())}")
+                    for detail in plan:
+                        print(f"        {detail}")
+                    if problems:
+                        print(f"        -> {', '.join(problems)}")
+
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    if failures:
+        print(f"Zapytania z pełnym skanem lub sortowaniem bez indeksu: {failures}")
+        sys.exit(1)
+    print('Wszystkie plany korzystają z indeksów')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Test obciążenia: jak liczba żądań na sekundę skaluje się z liczbą procesów gunicorn.
+#
+#   python benchmarks/load_test.py --workers 1,2,4 --requests 2000 --concurrency 32
+#
+import argparse
+import datetime
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+# Połączenia bezpośrednie z lokalnym serwerem, z pominięciem proxy ze zmiennych środowiskowych
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def prepare_database(database_url, members):
+    os.environ['DATABASE_URL'] = database_url
+    import jwt
+    from app import Member, User, create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='loadtest', email='loadtest@example.org', password='-', role='admin')
+        db.session.add(user)
+        db.session.add_all(
+            Member(first_name=f'Imię{i}', last_name=f'Nazwisko{i}', email=f'member{i}@example.org')
+            for i in range(members)
+        )
+        db.session.commit()
+        return jwt.encode({
+            'id': user.id,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with opener.open(f'{base_url}/healthz/ready', timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('Serwer nie osiągnął gotowości')
+
+
+def run_load(url, token, total_requests, concurrency):
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+
+    def single(_):
+        started = time.perf_counter()
+        try:
+            with opener.open(request, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except OSError:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(single, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'rps': total_requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': sum(1 for _, ok in results if not ok),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Skalowanie przepustowości API względem liczby procesów gunicorn')
+    parser.add_argument('--workers', default='1,2,4')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--members', type=int, default=1000)
+    parser.add_argument('--path', default='/api/members?page=1&limit=10')
+    parser.add_argument('--db', default='sqlite:///' + os.path.join(BACKEND_DIR, 'loadtest.db'))
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    token = prepare_database(args.db, args.members)
+    base_url = f'http://127.0.0.1:{args.port}'
+
+    print(f"{'procesy':>8} {'wątki':>6} {'req/s':>10} {'p50 [ms]':>10} {'p95 [ms]':>10} {'błędy':>7}")
+    for workers in [int(value) for value in args.workers.split(',')]:
+        env = dict(
+            os.environ,
+            DATABASE_URL=args.db,
+            WEB_CONCURRENCY=str(workers),
+            GUNICORN_THREADS=str(args.threads),
+            BIND=f'127.0.0.1:{args.port}',
+            LOG_LEVEL='warning',
+            GUNICORN_ACCESS_LOG='',
+        )
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env
+        )
+        try:
+            wait_until_ready(base_url)
+            result = run_load(base_url + args.path, token, args.requests, args.concurrency)
+            print(f"{workers:>8} {args.threads:>6} {result['rps']:>10.1f} {result['p50_ms']:>10.1f} "
+                  f"{result['p95_ms']:>10.1f} {result['errors']:>7}")
+        finally:
+            # Łagodne zamknięcie: SIGTERM i oczekiwanie na dokończenie żądań
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Syntetyczne dane do benchmarków i kontroli planów zapytań: członkowie, dokumenty
+# (z blobami i zakończonymi zadaniami przetwarzania) wstawiane wsadowo przez Core INSERT.
+import datetime
+import hashlib
+import random
+
+from app import Blob, Document, Job, Member, db
+from storage import blob_key
+
+CITIES = ['Warszawa', 'Kraków', 'Łódź', 'Wrocław', 'Poznań', 'Gdańsk', 'Szczecin', 'Lublin']
+STATUSES = ['Aktywny', 'Oczekujący', 'Zawieszony', 'Wygasły', 'Nieaktywny']
+ROLES = ['Członek', 'Członek', 'Członek', 'Skarbnik', 'Sekretarz', 'Przewodniczący']
+DOCUMENT_TYPES = ['Deklaracja', 'Zgoda RODO', 'Legitymacja', 'Inny']
+
+
+def insert_batches(table, rows, batch_size=5000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+
+
+def seed_members(count, batch_size=5000):
+    rng = random.Random(42)
+    now = datetime.datetime.utcnow()
+
+    def rows():
+        for member_id in range(1, count + 1):
+            yield {
+                'first_name': f"Imię{member_id}",
+                'last_name': f"Nazwisko{member_id}",
+                'email': f"czlonek{member_id}@example.org",
+                'phone': f"+48 600 {member_id % 1000:03d} {member_id % 997:03d}",
+                'address': f"ul. Długa {member_id % 300}",
+                'city': rng.choice(CITIES),
+                'postal_code': f"{rng.randint(10, 99)}-{rng.randint(100, 999)}",
+                'status': rng.choice(STATUSES),
+                'join_date': datetime.date(2015, 1, 1) + datetime.timedelta(days=member_id % 3000),
+                'party_role': rng.choice(ROLES),
+                'notes': 'Notatka ' * (member_id % 5),
+                'created_at': now - datetime.timedelta(seconds=member_id),
+                'updated_at': now,
+            }
+
+    insert_batches(Member.__table__, rows(), batch_size)
+    db.session.commit()
+
+
+def seed_documents(member_count, per_member, batch_size=5000):
+    # Co dziesiąty dokument ma treść identyczną z poprzednim (współdzielony blob)
+    now = datetime.datetime.utcnow()
+    blobs = []
+    documents = []
+    jobs = []
+    document_id = 0
+    for member_id in range(1, member_count + 1):
+        for number in range(per_member):
+            document_id += 1
+            if document_id % 10 != 0 or not blobs:
+                sha256 = hashlib.sha256(str(document_id).encode('ascii')).hexdigest()
+                blobs.append({'sha256': sha256, 'storage_key': blob_key(sha256), 'file_size': 1024 + document_id % 4096, 'ref_count': 0, 'created_at': now})
+            blob = blobs[-1]
+            blob['ref_count'] += 1
+            documents.append({
+                'member_id': member_id,
+                'document_type': DOCUMENT_TYPES[number % len(DOCUMENT_TYPES)],
+                'filename': f"dokument_{document_id}.pdf",
+                'storage_key': blob['storage_key'],
+                'file_size': blob['file_size'],
+                'upload_date': now - datetime.timedelta(minutes=document_id),
+                'mimetype': 'application/pdf',
+                'blob_id': len(blobs),
+            })
+            for kind in ('thumbnail', 'extract_text'):
+                jobs.append({'kind': kind, 'document_id': document_id, 'status': 'done', 'attempts': 1, 'max_attempts': 5, 'run_after': now, 'created_at': now, 'updated_at': now})
+
+    insert_batches(Blob.__table__, blobs, batch_size)
+    insert_batches(Document.__table__, documents, batch_size)
+    insert_batches(Job.__table__, jobs, batch_size)
+    db.session.commit()
+    return document_id
@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+# Pliki częściowe przesyłania (lokalny katalog tmp) i liczenie skrótu SHA-256 treści;
+# gotowe pliki trafiają do magazynu (storage.py) pod kluczem wynikającym ze skrótu
+
+CHUNK_SIZE = 64 * 1024
+
+
+def part_path(root, upload_id):
+    return os.path.join(root, 'tmp', f"{upload_id}.part")
+
+
+def copy_stream(stream, target, hasher=None, chunk_size=CHUNK_SIZE):
+    # Przepisuje strumień do pliku kawałkami, licząc skrót w trakcie; zwraca liczbę bajtów
+    written = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        target.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        written += len(chunk)
+    return written
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+# Strumieniowe odczytywanie importu członków (CSV lub NDJSON) bez buforowania całego ciała żądania
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(content_type, explicit=None):
+    if explicit:
+        return explicit.lower() if explicit.lower() in IMPORT_FORMATS else None
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'ndjson' in content_type or 'jsonlines' in content_type or 'x-json-stream' in content_type:
+        return 'ndjson'
+    return None
+
+
+def iter_rows(stream, import_format):
+    # Zwraca kolejne krotki (numer wiersza, dane, błąd)
+    text_stream = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+
+    if import_format == 'csv':
+        reader = csv.DictReader(text_stream)
+        for row_number, row in enumerate(reader, start=1):
+            # Puste komórki traktuj jak brak wartości (zadziałają wartości domyślne)
+            yield row_number, {key.strip(): value for key, value in row.items() if key and value not in (None, '')}, None
+        return
+
+    for row_number, line in enumerate(text_stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row_number, None, 'Nieprawidłowy JSON'
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, 'Wiersz musi być obiektem JSON'
+            continue
+        yield row_number, data, None
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,271 @@
+import collections
+import threading
+import time
+import traceback
+
+from sqlalchemy import func, insert, select
+
+from auth_cache import TTLCache
+from serialization import encode, rows_to_dicts
+
+# Dziennik zmian członków (tabela member_change, tylko dopisywanie) i jego rozsyłanie do klientów
+# (GET /api/changes - long-poll, GET /api/changes/stream - SSE). Wiersze dziennika powstają w tej
+# samej transakcji co zmiana. Jeden wątek na proces odpytuje dziennik co poll_interval sekund
+# (albo od razu po lokalnym zatwierdzeniu zmian) i trzyma ostatnie zmiany w pamięci - oczekujący
+# klienci czekają na warunku (threading.Condition), bez połączenia z bazą i bez własnych zapytań.
+# Numer sekwencyjny to klucz główny; identyfikator przydzielony transakcji, która jeszcze trwa,
+# tworzy lukę - publikacja zatrzymuje się na luce do czasu jej wypełnienia albo upływu gap_timeout
+# (luka po wycofanej transakcji nigdy się nie wypełni). Pominięte numery są sprawdzane dalej przez
+# late_window sekund: wpis zatwierdzony po publikacji dalszych numerów jest dopisywany do dziennika
+# ponownie (nowy, wyższy numer), bo klienci z nowszym since już by go nie odczytali.
+
+def session_changes(session, member_model, document_model):
+    # Wiersze dziennika dla obiektów w bieżącym flush (wywoływane w after_flush - identyfikatory już nadane)
+    deleted_members = {obj.id for obj in session.deleted if isinstance(obj, member_model)}
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, member_model):
+            rows.append({'action': 'created', 'member_id': obj.id})
+        elif isinstance(obj, document_model):
+            rows.append({'action': 'document_added', 'member_id': obj.member_id, 'document_id': obj.id})
+    for obj in session.dirty:
+        if isinstance(obj, member_model) and session.is_modified(obj, include_collections=False):
+            # Usunięcie miękkie (deleted_at) jest dla klientów usunięciem
+            rows.append({'action': 'deleted' if obj.deleted_at is not None else 'updated', 'member_id': obj.id})
+    for obj in session.deleted:
+        if isinstance(obj, member_model):
+            rows.append({'action': 'deleted', 'member_id': obj.id})
+        elif isinstance(obj, document_model) and obj.member_id not in deleted_members:
+            rows.append({'action': 'document_deleted', 'member_id': obj.member_id, 'document_id': obj.id})
+    return rows
+
+
+def record_changes(connection, table, rows):
+    if rows:
+        connection.execute(insert(table), [{'document_id': None, **row} for row in rows])
+
+
+def sse_event(change):
+    return f"id: {change['seq']}\nevent: change\ndata: {encode(change).decode('utf-8')}\n\n"
+
+
+# Jednorazowe bilety strumienia (EventSource nie wysyła nagłówków, a token JWT w adresie trafiałby
+# do dzienników dostępu). Bilet jest ważny krótko, a jego identyfikator można zużyć tylko raz.
+
+class MemoryTicketStore:
+    # Bilety zużyte w tym procesie - przy wielu procesach lub węzłach API użyj redis
+    def __init__(self, ttl, maxsize=100000):
+        self._used = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def consume(self, ticket_id):
+        with self._lock:
+            if self._used.get(ticket_id):
+                return False
+            self._used.set(ticket_id, True)
+            return True
+
+
+class RedisTicketStore:
+    def __init__(self, client, ttl, prefix='crc:ticket:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def consume(self, ticket_id):
+        return bool(self.client.set(f"{self.prefix}{ticket_id}", b'1', nx=True, ex=self.ttl))
+
+
+def create_ticket_store(config):
+    backend = config['CHANGES_TICKET_BACKEND']
+    if backend == 'memory':
+        return MemoryTicketStore(config['CHANGES_TICKET_TTL'])
+    if backend == 'redis':
+        # Zależność opcjonalna - potrzebna tylko dla biletów współdzielonych przez procesy
+        import redis
+        return RedisTicketStore(redis.Redis.from_url(config['REDIS_URL']), config['CHANGES_TICKET_TTL'])
+    raise ValueError(f"Nieznany backend biletów strumienia zmian: {backend}")
+
+
+class ChangeFeed:
+    def __init__(self, app, db, model, member_model, member_fields, poll_interval=1, buffer_size=1000, gap_timeout=2, batch_size=500,
+                 late_window=600, max_skipped=10000):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.member_model = member_model
+        self.member_fields = member_fields
+        self.poll_interval = poll_interval
+        self.gap_timeout = gap_timeout
+        self.batch_size = batch_size
+        self.last_seq = None
+        self._buffer = collections.deque()
+        self._buffer_size = buffer_size
+        self._floor = None
+        self._gap_since = None
+        self.late_window = late_window
+        self.max_skipped = max_skipped
+        # Numery pominięte po gap_timeout -> chwila pominięcia (time.monotonic)
+        self._skipped = {}
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Pierwsze odczytanie stanu w wątku wywołującym (żądanie), potem wątek odpytujący
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            with self.app.app_context():
+                self.poll()
+            self._thread = threading.Thread(target=self.run_forever, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def notify(self):
+        # Po zatwierdzeniu transakcji z wpisami dziennika w tym procesie
+        if self._thread is not None:
+            self._wakeup.set()
+
+    def run_forever(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    self.poll()
+            except Exception:
+                self.app.logger.warning(f"Błąd odczytu dziennika zmian: {traceback.format_exc()}")
+
+    def query(self, since, limit):
+        # Zmiany po numerze since wraz z bieżącym stanem członka (None po usunięciu)
+        model = self.model
+        names, columns = self.member_fields
+        rows = self.db.session.execute(
+            select(model.id, model.action, model.member_id, model.document_id, model.created_at, *columns)
+            .outerjoin(self.member_model, self.member_model.id == model.member_id)
+            .where(model.id > since)
+            .order_by(model.id)
+            .limit(limit)
+        ).all()
+        members = rows_to_dicts([row[5:] for row in rows], names, names)
+        return [
+            {
+                'seq': row[0],
+                'action': row[1],
+                'member_id': row[2],
+                'document_id': row[3],
+                'at': row[4].isoformat() if row[4] else None,
+                'member': member if member.get('id') is not None else None,
+            }
+            for row, member in zip(rows, members)
+        ]
+
+    def poll(self):
+        session = self.db.session
+        try:
+            if self.last_seq is None:
+                # Start od bieżącego końca dziennika - historia jest dostępna przez zapytanie do bazy
+                self.last_seq = self._floor = session.execute(select(func.max(self.model.id))).scalar() or 0
+                return
+
+            if self._skipped:
+                self.replay_late(session)
+
+            changes = self.query(self.last_seq, self.batch_size)
+            published = []
+            expected = self.last_seq + 1
+            for change in changes:
+                if change['seq'] != expected:
+                    if self._gap_since is None:
+                        self._gap_since = time.monotonic()
+                    if time.monotonic() - self._gap_since < self.gap_timeout:
+                        break
+                    self.skip(range(expected, change['seq']))
+                self._gap_since = None
+                published.append(change)
+                expected = change['seq'] + 1
+        finally:
+            session.remove()
+
+        if not published:
+            return
+        with self._condition:
+            for change in published:
+                if len(self._buffer) >= self._buffer_size:
+                    self._floor = self._buffer.popleft()['seq']
+                self._buffer.append(change)
+            self.last_seq = published[-1]['seq']
+            self._condition.notify_all()
+        if len(changes) >= self.batch_size and len(published) == len(changes):
+            # Zaległości większe niż jedna paczka - kolejny odczyt bez czekania
+            self._wakeup.set()
+
+    def skip(self, seqs):
+        now = time.monotonic()
+        for seq in seqs:
+            if len(self._skipped) >= self.max_skipped:
+                break
+            self._skipped[seq] = now
+
+    def replay_late(self, session):
+        # Pominięte numery, które pojawiły się w dzienniku (transakcja zatwierdzona po upływie gap_timeout)
+        cutoff = time.monotonic() - self.late_window
+        self._skipped = {seq: skipped_at for seq, skipped_at in self._skipped.items() if skipped_at > cutoff}
+        if not self._skipped:
+            return
+        model = self.model
+        late = session.execute(
+            select(model.id, model.action, model.member_id, model.document_id)
+            .where(model.id.in_(list(self._skipped)[:self.batch_size]))
+        ).all()
+        replayed = 0
+        for seq, action, member_id, document_id in late:
+            del self._skipped[seq]
+            # Wpis jeszcze nieopublikowany dla tej samej zmiany (np. ponowienie z innego procesu) wystarczy -
+            # stan członka jest dołączany przy odczycie
+            pending = session.execute(
+                select(model.id).where(
+                    model.id > self.last_seq, model.action == action, model.member_id == member_id, model.document_id == document_id
+                ).limit(1)
+            ).first()
+            if pending is None:
+                record_changes(session.connection(), model.__table__, [{'action': action, 'member_id': member_id, 'document_id': document_id}])
+                replayed += 1
+        if replayed:
+            session.commit()
+            self.app.logger.info(f"Dziennik zmian: {replayed} wpisów zatwierdzonych po luce dopisano ponownie")
+
+    def read(self, since, limit=None):
+        # (zmiany, reset): z pamięci, a dla starszego since - z bazy; reset=True, gdy dziennik
+        # nie sięga tak daleko (klient powinien pobrać dane od nowa)
+        limit = limit or self.batch_size
+        with self._condition:
+            if since >= self._floor:
+                changes = []
+                for change in reversed(self._buffer):
+                    if change['seq'] <= since:
+                        break
+                    changes.append(change)
+                changes.reverse()
+                return changes[:limit], False
+
+        oldest = self.db.session.execute(select(func.min(self.model.id))).scalar()
+        if oldest is None or since < oldest - 1:
+            return [], True
+        changes = [change for change in self.query(since, limit) if change['seq'] <= self.last_seq]
+        return changes, False
+
+    def wait(self, since, timeout):
+        # Czeka (bez połączenia z bazą) na zmianę nowszą niż since; zwraca False po upływie czasu
+        with self._condition:
+            return self._condition.wait_for(lambda: self.last_seq > since or self._stopping.is_set(), timeout)
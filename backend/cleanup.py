@@ -0,0 +1,209 @@
+import datetime
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, delete, select
+
+from blob_store import part_path, remove_quietly
+from storage import base_key, with_derived
+
+# Sprzątanie w tle. Usunięcie członka tylko oznacza wiersz (deleted_at) - członek znika od razu,
+# a MemberPurge (zadanie purge_members lub flask members-purge) po upływie delay sekund usuwa jego dane paczkami:
+# zadania, dokumenty i zwolnione bloby zapytaniami zbiorowymi (bez wczytywania obiektów ORM),
+# każda paczka w osobnej transakcji, a pliki - po zatwierdzeniu, równolegle w paczkach.
+# StorageReconciler porównuje klucze magazynu z bazą i znajduje pliki bez właściciela.
+
+FILE_BATCH_SIZE = 500
+
+
+def remove_files(storage, files, pool):
+    # files: (klucz w magazynie, ścieżka sprzed magazynu); klucze wraz z plikami pochodnymi
+    keys = [key for storage_key, _ in files if storage_key for key in with_derived(storage_key)]
+    paths = [path for storage_key, path in files if not storage_key and path]
+    batches = [keys[start:start + FILE_BATCH_SIZE] for start in range(0, len(keys), FILE_BATCH_SIZE)]
+    futures = [pool.submit(storage.delete_many, batch) for batch in batches]
+    futures += [pool.submit(remove_quietly, path) for path in paths]
+    for future in futures:
+        future.result()
+    return len(keys) + len(paths)
+
+
+class ConcurrentPurge(Exception):
+    # Paczkę usunął w międzyczasie inny proces - ten przerywa pracę nad członkiem
+    pass
+
+
+class MemberPurge:
+    def __init__(self, db, member_model, document_model, blob_model, job_model, upload_model, storage, upload_folder, batch_size=500, workers=8, delay=0, logger=None):
+        self.db = db
+        self.member = member_model
+        self.document = document_model
+        self.blob = blob_model
+        self.job = job_model
+        self.upload = upload_model
+        self.storage = storage
+        self.upload_folder = upload_folder
+        self.batch_size = batch_size
+        self.workers = workers
+        # Sekundy od usunięcia miękkiego - w tym czasie wiersz członka pozostaje w bazie, aby synchronizacja
+        # indeksów wyszukiwania w innych procesach (search.py) odczytała usunięcie
+        self.delay = delay
+        self.logger = logger
+
+    def pending(self, delay=None):
+        member = self.member
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.delay if delay is None else delay)
+        return [row[0] for row in self.db.session.execute(
+            select(member.id).where(member.deleted_at.is_not(None), member.deleted_at <= cutoff)
+            .order_by(member.deleted_at, member.id).execution_options(include_deleted=True)
+        )]
+
+    def run(self, delay=None):
+        # Oznaczeni członkowie usunięci co najmniej delay sekund temu; zwraca (członkowie, dokumenty, pliki)
+        totals = Counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for member_id in self.pending(delay):
+                try:
+                    documents, files = self.purge_member(member_id, pool)
+                except ConcurrentPurge:
+                    self.db.session.rollback()
+                    continue
+                totals.update(members=1, documents=documents, files=files)
+        return totals['members'], totals['documents'], totals['files']
+
+    def purge_member(self, member_id, pool):
+        started = time.perf_counter()
+        session = self.db.session
+        documents = files = 0
+        while True:
+            orphaned, count = self.purge_documents(member_id)
+            if not count:
+                break
+            session.commit()
+            documents += count
+            files += remove_files(self.storage, orphaned, pool)
+
+        upload, member = self.upload, self.member
+        uploads = [row[0] for row in session.execute(select(upload.id).where(upload.member_id == member_id))]
+        session.execute(delete(upload).where(upload.member_id == member_id), execution_options={'synchronize_session': False})
+        session.execute(
+            delete(member).where(member.id == member_id, member.deleted_at.is_not(None)),
+            execution_options={'synchronize_session': False}
+        )
+        session.commit()
+        for upload_id in uploads:
+            remove_quietly(part_path(self.upload_folder, upload_id))
+
+        if self.logger:
+            self.logger.info(f"Członek {member_id} usunięty: {documents} dokumentów, {files} plików w {time.perf_counter() - started:.1f}s")
+        return documents, files
+
+    def purge_documents(self, member_id):
+        # Jedna paczka dokumentów członka; zwraca pliki do usunięcia po zatwierdzeniu i liczbę dokumentów
+        session = self.db.session
+        document, blob, job = self.document, self.blob, self.job
+        rows = session.execute(
+            select(document.id, document.blob_id, document.storage_key, document.file_path)
+            .where(document.member_id == member_id)
+            .limit(self.batch_size)
+        ).all()
+        if not rows:
+            return [], 0
+
+        ids = [row.id for row in rows]
+        session.execute(delete(job).where(job.document_id.in_(ids)), execution_options={'synchronize_session': False})
+        deleted = session.execute(delete(document).where(document.id.in_(ids)), execution_options={'synchronize_session': False}).rowcount
+        if deleted != len(ids):
+            raise ConcurrentPurge(member_id)
+
+        orphaned = [(row.storage_key, row.file_path) for row in rows if row.blob_id is None]
+        released = Counter(row.blob_id for row in rows if row.blob_id is not None)
+        if released:
+            # Liczniki odwołań zmniejszane jednym poleceniem dla wszystkich blobów paczki (executemany)
+            table = blob.__table__
+            session.execute(
+                table.update().where(table.c.id == bindparam('blob_id')).values(ref_count=table.c.ref_count - bindparam('released')),
+                [{'blob_id': blob_id, 'released': count} for blob_id, count in released.items()]
+            )
+            freed = session.execute(
+                select(blob.id, blob.storage_key, blob.file_path).where(blob.id.in_(list(released)), blob.ref_count <= 0)
+            ).all()
+            if freed:
+                session.execute(
+                    delete(blob).where(blob.id.in_([row.id for row in freed]), blob.ref_count <= 0),
+                    execution_options={'synchronize_session': False}
+                )
+                orphaned += [(row.storage_key, row.file_path) for row in freed]
+        return orphaned, len(ids)
+
+
+class StorageReconciler:
+    # Pliki magazynu, do których nie odwołuje się żaden blob ani dokument, oraz porzucone pliki
+    # częściowe przesyłania (UPLOAD_FOLDER/tmp). Pliki młodsze niż grace są pomijane - zapis pliku
+    # poprzedza zatwierdzenie rekordu w bazie.
+    def __init__(self, db, document_model, blob_model, upload_model, storage, upload_folder, grace=86400, batch_size=1000):
+        self.db = db
+        self.document = document_model
+        self.blob = blob_model
+        self.upload = upload_model
+        self.storage = storage
+        self.upload_folder = upload_folder
+        self.grace = grace
+        self.batch_size = batch_size
+
+    def orphaned_keys(self):
+        # (klucz, rozmiar) plików magazynu bez właściciela, sprawdzane w bazie paczkami kluczy
+        cutoff = time.time() - self.grace
+        batch = []
+        for key, modified, size in self.storage.iter_keys():
+            # Pliki częściowe i tymczasowe (gdy magazyn leży w UPLOAD_FOLDER) - patrz orphaned_parts
+            if key.startswith('tmp/') or modified > cutoff:
+                continue
+            batch.append((key, size))
+            if len(batch) >= self.batch_size:
+                yield from self.unreferenced(batch)
+                batch = []
+        if batch:
+            yield from self.unreferenced(batch)
+
+    def unreferenced(self, batch):
+        session = self.db.session
+        document, blob = self.document, self.blob
+        bases = {key: base_key(key) for key, _ in batch}
+        keys = list(set(bases.values()))
+        referenced = {row[0] for row in session.execute(select(blob.storage_key).where(blob.storage_key.in_(keys)))}
+        referenced |= {row[0] for row in session.execute(select(document.storage_key).where(document.storage_key.in_(keys)))}
+
+        # Pliki sprzed magazynu (flask storage-migrate) są wskazywane ścieżką bezwzględną
+        paths = {key: self.storage.local_path(base) for key, base in bases.items()}
+        local = [path for path in set(paths.values()) if path]
+        if local:
+            referenced_paths = {row[0] for row in session.execute(select(blob.file_path).where(blob.file_path.in_(local)))}
+            referenced_paths |= {row[0] for row in session.execute(select(document.file_path).where(document.file_path.in_(local)))}
+        else:
+            referenced_paths = set()
+        # Bez połączenia z bazą w trakcie listowania kolejnych kluczy (np. S3)
+        session.close()
+
+        for key, size in batch:
+            if bases[key] not in referenced and paths[key] not in referenced_paths:
+                yield key, size
+
+    def orphaned_parts(self):
+        # Pliki w UPLOAD_FOLDER/tmp bez aktywnego przesyłania (pliki .part) lub tymczasowe
+        directory = os.path.join(self.upload_folder, 'tmp')
+        if not os.path.isdir(directory):
+            return []
+        cutoff = time.time() - self.grace
+        candidates = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.stat().st_mtime <= cutoff:
+                candidates.append(entry)
+        upload_ids = [entry.name[:-len('.part')] for entry in candidates if entry.name.endswith('.part')]
+        active = {row[0] for row in self.db.session.execute(select(self.upload.id).where(self.upload.id.in_(upload_ids)))} if upload_ids else set()
+        return [
+            (entry.path, entry.stat().st_size) for entry in candidates
+            if not (entry.name.endswith('.part') and entry.name[:-len('.part')] in active)
+        ]
@@ -0,0 +1,64 @@
+import gzip
+
+from flask import current_app, request
+
+# Kompresja dużych odpowiedzi (gzip lub brotli, jeśli zainstalowany). Odpowiedzi strumieniowane
+# i pliki (send_file, zakresy bajtów) są pomijane - te obsługuje serwer proxy.
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-msgpack', 'text/plain', 'text/csv'}
+
+
+def brotli_module():
+    # Zależność opcjonalna - bez niej używany jest gzip
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    if accepted['br'] and brotli_module() is not None:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if encoding == 'br':
+        compressed = brotli_module().compress(body, quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+    else:
+        compressed = gzip.compress(body, compresslevel=current_app.config['COMPRESS_LEVEL'], mtime=0)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # Inna reprezentacja tych samych danych - ETag słaby, porównanie If-None-Match nadal działa
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    if app.config['COMPRESS_MIN_SIZE'] > 0:
+        app.after_request(compress_response)
@@ -0,0 +1,75 @@
+import io
+import re
+import shlex
+import subprocess
+import zipfile
+
+from jobs import PermanentJobError
+
+# Przetwarzanie przesłanych dokumentów w tle: skanowanie antywirusowe (zewnętrzne polecenie),
+# miniatury obrazów (Pillow) i wyodrębnianie tekstu (pliki tekstowe, DOCX, PDF przez pypdf).
+# Funkcje działają na pliku lokalnym i zwracają wynik (None, gdy typ pliku nie jest obsługiwany);
+# zapis wyników do magazynu należy do wywołującego.
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+def scan_file(path, command, timeout=120):
+    # Konwencja clamdscan/clamscan: 0 - czysty, 1 - wykryto zagrożenie, inne - błąd skanera
+    result = subprocess.run(shlex.split(command) + [path], capture_output=True, timeout=timeout)
+    if result.returncode == 1:
+        output = result.stdout.decode('utf-8', 'replace').strip()
+        raise PermanentJobError(f"Wykryto zagrożenie: {output[-500:]}")
+    if result.returncode != 0:
+        raise RuntimeError(f"Skaner zakończył się kodem {result.returncode}: {result.stderr.decode('utf-8', 'replace')[-500:]}")
+    return 'done'
+
+
+def make_thumbnail(path, mimetype, size):
+    # Miniatura PNG (bajty)
+    if not (mimetype or '').startswith('image/'):
+        return None
+    try:
+        # Zależność opcjonalna - bez niej miniatury nie są tworzone
+        from PIL import Image
+    except ImportError:
+        return None
+
+    output = io.BytesIO()
+    with Image.open(path) as image:
+        image.thumbnail((size, size))
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA')
+        image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def docx_text(path):
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read('word/document.xml').decode('utf-8', 'replace')
+    paragraphs = re.split(r'</w:p>', xml)
+    return '\n'.join(re.sub(r'<[^>]+>', '', paragraph) for paragraph in paragraphs).strip()
+
+
+def pdf_text(path):
+    try:
+        # Zależność opcjonalna - bez niej tekst z PDF nie jest wyodrębniany
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages).strip()
+
+
+def extract_text(path, mimetype, max_chars):
+    mimetype = mimetype or ''
+    if mimetype.startswith('text/') or mimetype in ('application/json', 'application/xml'):
+        with open(path, 'rb') as source:
+            text = source.read(max_chars * 4).decode('utf-8', 'replace')
+    elif mimetype == DOCX_MIMETYPE:
+        text = docx_text(path)
+    elif mimetype == 'application/pdf':
+        text = pdf_text(path)
+    else:
+        text = None
+
+    return text[:max_chars] if text is not None else None
@@ -0,0 +1,73 @@
+# Profil produkcyjny gunicorn. Wartości można nadpisać zmiennymi środowiskowymi.
+import multiprocessing
+import os
+import signal
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# Procesy robocze z pulą wątków: hashowanie haseł i serializacja obciążają CPU (procesy),
+# a oczekiwanie na bazę danych i pliki dobrze znosi wątki
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Subskrybenci /api/changes/stream i long-poll zajmują wątek na czas połączenia - przy setkach
+# klientów: GUNICORN_WORKER_CLASS=gevent (pakiet gevent z requirements.txt)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Strumień SSE domyślnie tylko z gevent; z pulą wątków klienci odpytują dziennik bez oczekiwania
+os.environ.setdefault('CHANGES_STREAM', '1' if worker_class == 'gevent' else '0')
+
+# Aplikacja importowana raz w procesie głównym, procesy robocze powstają przez fork (współdzielona
+# pamięć, szybszy start). Wątki, pule procesów i połączenia z bazą powstają dopiero w procesie
+# roboczym (przy pierwszym użyciu); pule połączeń utworzone przed fork są porzucane w post_fork.
+# Po zmianie kodu potrzebny restart procesu głównego (GUNICORN_PRELOAD=0 - import w każdym procesie).
+# Gevent łata moduł threading dopiero w procesie roboczym, więc z nim domyślnie bez preload
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+
+# Pula połączeń SQLAlchemy powinna pomieścić wszystkie wątki procesu
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Okresowa wymiana procesów ogranicza skutki wycieków pamięci
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None  # pusta wartość wyłącza
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    # Po SIGTERM proces przestaje być "gotowy" (503 na /healthz/ready),
+    # ale dokańcza trwające żądania w ramach graceful_timeout
+    from app import start_draining
+
+    handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        start_draining()
+        handle_exit(sig, frame)
+
+    worker.handle_exit = drain_then_exit
+    signal.signal(signal.SIGTERM, drain_then_exit)
+
+    # Wątki kolejki zadań od startu procesu roboczego - zadania zaległe, ponowienia i zadania
+    # po wygaśnięciu dzierżawy nie czekają na pierwsze przesłanie pliku w tym procesie;
+    # indeks wyszukiwania (SEARCH_BACKEND=ngram) budowany w tle, poza pierwszym żądaniem
+    from wsgi import app
+
+    app.extensions['job_runner'].start()
+    app.extensions['member_search'].start()
+
+
+def post_fork(server, worker):
+    # Połączenia otwarte w procesie głównym (preload_app) zostają mu - proces roboczy otwiera własne
+    if not preload_app:
+        return
+    from app import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
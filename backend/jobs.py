@@ -0,0 +1,146 @@
+import datetime
+import threading
+import time
+import traceback
+
+from sqlalchemy import update
+
+# Zadania w tle zapisane w bazie danych (tabela job): pula wątków w procesie aplikacji albo
+# osobny proces (flask jobs-worker) pobiera zadania, których termin minął. Zadanie jest
+# przejmowane warunkowym UPDATE (status 'queued' -> 'running'), więc kilka procesów może
+# obsługiwać tę samą kolejkę. Zadanie przerwane w trakcie (np. restart) wraca do kolejki po
+# upływie czasu dzierżawy; błąd powoduje ponowienie z wykładniczym opóźnieniem.
+
+
+class PermanentJobError(Exception):
+    # Błąd, którego ponowienie nic nie zmieni (np. wykryte zagrożenie w pliku)
+    pass
+
+
+class JobRunner:
+    def __init__(self, app, db, model, handlers, workers=2, poll_interval=5, lease=300, retry_delay=10, max_attempts=5):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._recovered_at = None
+
+    def enqueue(self, session, kind, delay=0, **values):
+        # Dodaje zadanie do bieżącej transakcji - zostanie zapisane razem z danymi, których dotyczy;
+        # delay - sekundy, przed upływem których zadanie nie zostanie pobrane
+        run_after = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+        job = self.model(kind=kind, status='queued', attempts=0, max_attempts=self.max_attempts, run_after=run_after, **values)
+        session.add(job)
+        return job
+
+    def notify(self):
+        # Wywoływane po zatwierdzeniu transakcji z nowymi zadaniami
+        self.start()
+        self._wakeup.set()
+
+    def start(self):
+        # Wątki uruchamiane w procesie roboczym serwera (nie przed fork): przy starcie procesu
+        # (gunicorn post_worker_init), a pod innym serwerem - przy pierwszym powiadomieniu
+        if not self.workers or self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(target=self.run_forever, name=f"job-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def run_forever(self):
+        while not self._stopping.is_set():
+            # Powiadomienie w trakcie run_pending zostaje zachowane i przerywa oczekiwanie
+            self._wakeup.clear()
+            try:
+                ran = self.run_pending()
+            except Exception:
+                # Np. baza chwilowo niedostępna - wątek działa dalej i ponawia po poll_interval
+                self.app.logger.warning(f"Błąd kolejki zadań: {traceback.format_exc()}")
+                ran = 0
+            if not ran:
+                self._wakeup.wait(self.poll_interval)
+
+    def run_pending(self, limit=None):
+        # Wykonuje zadania, których termin minął; zwraca liczbę wykonanych
+        done = 0
+        while limit is None or done < limit:
+            with self.app.app_context():
+                job_id = self.claim()
+                if job_id is None:
+                    return done
+                self.execute(job_id)
+            done += 1
+        return done
+
+    def claim(self):
+        model = self.model
+        session = self.db.session
+        now = datetime.datetime.utcnow()
+
+        # Zadania porzucone przez zatrzymany proces wracają do kolejki (sprawdzane co poll_interval)
+        if self._recovered_at is None or time.monotonic() - self._recovered_at >= self.poll_interval:
+            self._recovered_at = time.monotonic()
+            session.execute(
+                update(model)
+                .where(model.status == 'running', model.locked_at < now - datetime.timedelta(seconds=self.lease))
+                .values(status='queued', locked_at=None)
+            )
+            session.commit()
+
+        candidates = session.query(model.id).filter(model.status == 'queued', model.run_after <= now).order_by(model.run_after, model.id).limit(10).all()
+        for (job_id,) in candidates:
+            claimed = session.execute(
+                update(model)
+                .where(model.id == job_id, model.status == 'queued')
+                .values(status='running', locked_at=now, attempts=model.attempts + 1)
+            ).rowcount
+            session.commit()
+            if claimed:
+                return job_id
+        return None
+
+    def execute(self, job_id):
+        session = self.db.session
+        job = session.get(self.model, job_id)
+        if job is None:
+            return
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise PermanentJobError(f"Nieznany rodzaj zadania: {job.kind}")
+            job.status = handler(job) or 'done'
+            job.last_error = None
+        except Exception as e:
+            session.rollback()
+            job = session.get(self.model, job_id)
+            if job is None:
+                # Zadanie usunięte w trakcie (razem z dokumentem)
+                return
+            job.last_error = str(e)[:1000]
+            if isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts:
+                job.status = 'failed'
+            else:
+                # Ponowienie z wykładniczym opóźnieniem: retry_delay, 2 * retry_delay, 4 * retry_delay, ...
+                job.status = 'queued'
+                job.run_after = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            if not isinstance(e, PermanentJobError):
+                self.app.logger.warning(f"Zadanie {job.kind} #{job.id} nie powiodło się: {traceback.format_exc()}")
+        job.locked_at = None
+        session.commit()
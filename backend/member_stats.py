@@ -0,0 +1,128 @@
+from collections import Counter
+
+from sqlalchemy import func, inspect, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+# Statystyki rejestru utrzymywane przyrostowo: tabela (wymiar, wartość, liczba) jest zmieniana
+# w tej samej transakcji co zapis członka, więc odczyt nie wymaga GROUP BY po całej tabeli członków.
+# Wartość pusta ('') oznacza brak danej (np. członek bez miasta).
+
+STAT_DIMENSIONS = ('status', 'party_role', 'city', 'join_month')
+STAT_FIELDS = ('status', 'party_role', 'city', 'join_date')
+
+
+def join_month(join_date):
+    return join_date.strftime('%Y-%m') if join_date else ''
+
+
+def stat_keys(status, party_role, city, join_date):
+    return [
+        ('total', ''),
+        ('status', status or ''),
+        ('party_role', party_role or ''),
+        ('city', city or ''),
+        ('join_month', join_month(join_date)),
+    ]
+
+
+def old_value(state, field):
+    # Wartość sprzed zmian (historia atrybutu; wczytana z bazy, jeśli obiekt był wygaszony)
+    history = state.attrs[field].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else None
+
+
+def soft_deleted(state):
+    history = state.attrs['deleted_at'].history
+    return bool(history.added) and history.added[0] is not None and not any(history.deleted)
+
+
+def changed_deltas(session, model):
+    # Wywoływane przed flush: usuwane i zmieniane obiekty (wiersze są jeszcze w bazie)
+    deltas = Counter()
+    for obj in session.deleted:
+        if isinstance(obj, model):
+            state = inspect(obj)
+            for key in stat_keys(*(old_value(state, field) for field in STAT_FIELDS)):
+                deltas[key] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, model) and obj not in session.deleted:
+            state = inspect(obj)
+            if soft_deleted(state):
+                # Usunięcie miękkie (deleted_at) - członek znika ze statystyk jak przy usunięciu wiersza
+                for key in stat_keys(*(old_value(state, field) for field in STAT_FIELDS)):
+                    deltas[key] -= 1
+                continue
+            if not any(state.attrs[field].history.has_changes() for field in STAT_FIELDS):
+                continue
+            for key in stat_keys(*(old_value(state, field) for field in STAT_FIELDS)):
+                deltas[key] -= 1
+            for key in stat_keys(*(getattr(obj, field) for field in STAT_FIELDS)):
+                deltas[key] += 1
+    return deltas
+
+
+def inserted_deltas(session, model):
+    # Wywoływane po flush: nowe obiekty mają już wartości domyślne kolumn (status, join_date)
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, model):
+            for key in stat_keys(*(getattr(obj, field) for field in STAT_FIELDS)):
+                deltas[key] += 1
+    return deltas
+
+
+def rows_deltas(old_rows, changes):
+    # Różnice dla zmiany masowej (UPDATE bez ładowania obiektów): wiersze (status, party_role, city, join_date)
+    deltas = Counter()
+    for row in old_rows:
+        old = dict(zip(STAT_FIELDS, row))
+        new = {**old, **{field: value for field, value in changes.items() if field in STAT_FIELDS}}
+        for key in stat_keys(*(old[field] for field in STAT_FIELDS)):
+            deltas[key] -= 1
+        for key in stat_keys(*(new[field] for field in STAT_FIELDS)):
+            deltas[key] += 1
+    return deltas
+
+
+def apply_deltas(connection, table, deltas):
+    for (dimension, value), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        where = (table.c.dimension == dimension) & (table.c.value == value)
+        if connection.execute(update(table).where(where).values(count=table.c.count + delta)).rowcount:
+            continue
+        try:
+            # Nowa wartość wymiaru; punkt zapisu, bo ten sam wiersz mógł dodać równoległy zapis
+            with connection.begin_nested():
+                connection.execute(insert(table).values(dimension=dimension, value=value, count=delta))
+        except IntegrityError:
+            connection.execute(update(table).where(where).values(count=table.c.count + delta))
+
+
+def compute_stats(connection, member_table):
+    # Pełne przeliczenie (GROUP BY) - dla polecenia przebudowy i kontroli spójności
+    counts = Counter()
+    columns = [member_table.c[field] for field in STAT_FIELDS]
+    query = select(*columns, func.count()).where(member_table.c.deleted_at.is_(None)).group_by(*columns)
+    for row in connection.execute(query):
+        for key in stat_keys(*row[:4]):
+            counts[key] += row[4]
+    return counts
+
+
+def stored_stats(connection, table):
+    return Counter({
+        (row.dimension, row.value): row.count
+        for row in connection.execute(select(table.c.dimension, table.c.value, table.c.count))
+    })
+
+
+def stats_response(stored):
+    result = {'total': stored.get(('total', ''), 0)}
+    for dimension in STAT_DIMENSIONS:
+        result[dimension] = {
+            value: count for (name, value), count in sorted(stored.items()) if name == dimension and count > 0
+        }
+    return result
@@ -0,0 +1,228 @@
+import bisect
+import threading
+import time
+from collections import Counter as TallyCounter
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentacja wydajności: liczba i czas zapytań SQL na żądanie, nagłówek Server-Timing,
+# histogramy w formacie Prometheus (/metrics), dziennik wolnych zapytań i ostrzeżenia N+1.
+# Metryki są liczone w obrębie procesu - przy kilku procesach gunicorn każdy ma własne wartości.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            values = self._values if self._values or self.labelnames else {(): 0}
+            for labels, value in sorted(values.items()):
+                lines.append(f'{self.name}{format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    # Wartości odczytywane w chwili zbierania metryk: funkcja zwraca {etykiety: wartość}
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render(self):
+        lines = self.header()
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f'{self.name}{format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = self.header()
+        bucket_labels = self.labelnames + ('le',)
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{self.name}_bucket{format_labels(bucket_labels, labels + (le,))} {cumulative}')
+                lines.append(f'{self.name}_sum{format_labels(self.labelnames, labels)} {total}')
+                lines.append(f'{self.name}_count{format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Czas obsługi żądania HTTP', ('method', 'route', 'status')
+))
+request_queries = registry.register(Histogram(
+    'db_queries_per_request', 'Liczba zapytań SQL na żądanie', ('route',), buckets=QUERY_COUNT_BUCKETS
+))
+query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'Czas wykonania pojedynczego zapytania SQL'
+))
+slow_queries = registry.register(Counter(
+    'db_slow_queries_total', 'Liczba zapytań SQL przekraczających próg SLOW_QUERY_MS'
+))
+upload_bytes = registry.register(Counter(
+    'document_upload_bytes_total', 'Bajty przesłanych dokumentów'
+))
+download_bytes = registry.register(Counter(
+    'document_download_bytes_total', 'Bajty pobranych dokumentów wysłanych przez aplikację'
+))
+
+
+def pool_state():
+    pool = current_app.extensions['sqlalchemy'].engine.pool
+    state = {}
+    for name in ('size', 'checkedout', 'overflow', 'checkedin'):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            state[(name,)] = reader()
+    return state
+
+
+registry.register(Gauge('db_pool_connections', 'Stan puli połączeń SQLAlchemy', ('state',), collect=pool_state))
+
+
+# Liczenie zapytań SQL w obrębie bieżącego żądania
+@event.listens_for(Engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    elapsed = time.perf_counter() - started
+    query_duration.observe(elapsed)
+
+    if not has_request_context() or 'query_count' not in g:
+        return
+
+    g.query_count += 1
+    g.query_time += elapsed
+    if g.query_statements is not None:
+        g.query_statements[statement] += 1
+
+    threshold = current_app.config.get('SLOW_QUERY_MS')
+    if threshold and elapsed * 1000 >= threshold:
+        slow_queries.inc()
+        current_app.logger.warning(
+            f"Wolne zapytanie ({elapsed * 1000:.1f} ms, {request.method} {request.path}): {statement}"
+        )
+
+
+def start_request():
+    g.request_started = time.perf_counter()
+    g.query_count = 0
+    g.query_time = 0.0
+    g.query_statements = TallyCounter() if current_app.config.get('DETECT_N_PLUS_ONE') else None
+
+
+def finish_request(response):
+    if 'request_started' not in g:
+        return response
+
+    elapsed = time.perf_counter() - g.request_started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_duration.observe(elapsed, request.method, route, str(response.status_code))
+    request_queries.observe(g.query_count, route)
+
+    response.headers['Server-Timing'] = (
+        f'db;dur={g.query_time * 1000:.1f};desc="{g.query_count} queries", '
+        f'app;dur={elapsed * 1000:.1f}'
+    )
+
+    # To samo zapytanie wykonane wiele razy w jednym żądaniu to zwykle leniwe ładowanie w pętli (N+1)
+    if g.query_statements:
+        threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+        for statement, count in g.query_statements.items():
+            if count >= threshold:
+                current_app.logger.warning(
+                    f"Możliwy problem N+1 w {request.method} {route}: zapytanie wykonane {count} razy: {statement}"
+                )
+    return response
+
+
+def metrics_endpoint():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
@@ -0,0 +1,27 @@
+"""upload session status
+
+Revision ID: 2b9d4f6e8a13
+Revises: 5f1c8e3a7d62
+Create Date: 2026-10-18 18:42:09.371526
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b9d4f6e8a13'
+down_revision = '5f1c8e3a7d62'
+branch_labels = None
+depends_on = None
+
+
+# Przejęcie przesyłania przez POST /api/uploads/<id>/complete (open -> completing)
+def upgrade():
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), server_default='open', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.drop_column('status')
@@ -0,0 +1,101 @@
+"""blobs, resumable uploads, background jobs and member stats
+
+Revision ID: 4c8d2f6a1e57
+Revises: b1a7e0c93d21
+Create Date: 2026-10-18 09:14:05.871230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8d2f6a1e57'
+down_revision = 'b1a7e0c93d21'
+branch_labels = None
+depends_on = None
+
+
+# Po migracji istniejącej bazy: flask stats-rebuild (liczniki member_stat) i flask storage-migrate
+def upgrade():
+    op.create_table('blob',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('file_path', sa.String(length=255), nullable=True),
+    sa.Column('storage_key', sa.String(length=255), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.create_table('upload_session',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('document_type', sa.String(length=50), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('total_size', sa.BigInteger(), nullable=True),
+    sa.Column('received', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['member.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('member_stat',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'value')
+    )
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.create_index('ix_member_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('document', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('storage_key', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('mimetype', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+        batch_op.alter_column('file_path',
+               existing_type=sa.String(length=255),
+               nullable=True)
+        batch_op.create_foreign_key('fk_document_blob_id_blob', 'blob', ['blob_id'], ['id'])
+
+    op.create_table('job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['document.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.create_index('ix_job_status_run_after', ['status', 'run_after'], unique=False)
+        batch_op.create_index('ix_job_document_id', ['document_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_document_id')
+        batch_op.drop_index('ix_job_status_run_after')
+
+    op.drop_table('job')
+    with op.batch_alter_table('document', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_document_blob_id_blob', type_='foreignkey')
+        batch_op.alter_column('file_path',
+               existing_type=sa.String(length=255),
+               nullable=False)
+        batch_op.drop_column('blob_id')
+        batch_op.drop_column('mimetype')
+        batch_op.drop_column('storage_key')
+
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.drop_index('ix_member_created_at_id')
+
+    op.drop_table('member_stat')
+    op.drop_table('upload_session')
+    op.drop_table('blob')
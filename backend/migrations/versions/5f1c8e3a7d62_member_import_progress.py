@@ -0,0 +1,41 @@
+"""member import progress
+
+Revision ID: 5f1c8e3a7d62
+Revises: 7a2e4c9d1b38
+Create Date: 2026-10-18 16:20:37.512094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1c8e3a7d62'
+down_revision = '7a2e4c9d1b38'
+branch_labels = None
+depends_on = None
+
+
+# Postęp importu masowego wspólny dla wszystkich procesów (GET /api/members/bulk/<import_id>)
+def upgrade():
+    op.create_table('member_import',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('mode', sa.String(length=10), nullable=False),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('member_import', schema=None) as batch_op:
+        batch_op.create_index('ix_member_import_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('member_import', schema=None) as batch_op:
+        batch_op.drop_index('ix_member_import_updated_at')
+
+    op.drop_table('member_import')
@@ -0,0 +1,37 @@
+"""member soft delete
+
+Revision ID: 7a2e4c9d1b38
+Revises: d3f6a8b2c591
+Create Date: 2026-10-18 14:05:12.204871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2e4c9d1b38'
+down_revision = 'd3f6a8b2c591'
+branch_labels = None
+depends_on = None
+
+
+# Usuwanie członków w tle (patrz cleanup.py); indeksy listy członków obejmują deleted_at
+def upgrade():
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.drop_index('ix_member_created_at_id')
+        batch_op.drop_index('ix_member_status_created_at_id')
+        batch_op.create_index('ix_member_created_at_id', ['created_at', 'id', 'deleted_at'], unique=False)
+        batch_op.create_index('ix_member_status_created_at_id', ['status', 'created_at', 'id', 'deleted_at'], unique=False)
+        batch_op.create_index('ix_member_deleted_at', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.drop_index('ix_member_deleted_at')
+        batch_op.drop_index('ix_member_status_created_at_id')
+        batch_op.drop_index('ix_member_created_at_id')
+        batch_op.create_index('ix_member_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_member_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,43 @@
+"""indexes for hot queries
+
+Revision ID: 9e3b5d7c2a14
+Revises: 4c8d2f6a1e57
+Create Date: 2026-10-18 09:20:37.442918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b5d7c2a14'
+down_revision = '4c8d2f6a1e57'
+branch_labels = None
+depends_on = None
+
+
+# Plany zapytań sprawdza benchmarks/check_query_plans.py
+def upgrade():
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.create_index('ix_member_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_member_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('document', schema=None) as batch_op:
+        batch_op.create_index('ix_document_member_id_upload_date', ['member_id', 'upload_date'], unique=False)
+        batch_op.create_index('ix_document_blob_id', ['blob_id'], unique=False)
+
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.create_index('ix_upload_session_member_id', ['member_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.drop_index('ix_upload_session_member_id')
+
+    with op.batch_alter_table('document', schema=None) as batch_op:
+        batch_op.drop_index('ix_document_blob_id')
+        batch_op.drop_index('ix_document_member_id_upload_date')
+
+    with op.batch_alter_table('member', schema=None) as batch_op:
+        batch_op.drop_index('ix_member_updated_at')
+        batch_op.drop_index('ix_member_status_created_at_id')
@@ -0,0 +1,33 @@
+"""member change log
+
+Revision ID: d3f6a8b2c591
+Revises: 9e3b5d7c2a14
+Create Date: 2026-10-18 11:02:48.615307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f6a8b2c591'
+down_revision = '9e3b5d7c2a14'
+branch_labels = None
+depends_on = None
+
+
+# Dziennik zmian dla GET /api/changes i /api/changes/stream (patrz change_feed.py)
+def upgrade():
+    op.create_table('member_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+
+
+def downgrade():
+    op.drop_table('member_change')
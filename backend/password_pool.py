@@ -0,0 +1,109 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from auth_cache import TTLCache
+
+# Hashowanie haseł (celowo kosztowne obliczeniowo) poza wątkiem żądania: w osobnej puli
+# procesów z ograniczoną kolejką. Gdy kolejka jest pełna, żądanie od razu dostaje odmowę
+# zamiast blokować pozostałe endpointy.
+
+
+class HashingOverloaded(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, method, workers=1, queue_size=8, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # Hash zapisany z innym algorytmem lub liczbą iteracji niż obecnie skonfigurowane
+        return password_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        if not self.workers:
+            try:
+                return function(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._pool().submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Miejsce w kolejce zwalniane dopiero po zakończeniu obliczeń - cancel() po przekroczeniu czasu
+        # nie zatrzymuje zadania, które już działa w procesie puli
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingOverloaded()
+
+    def _pool(self):
+        # Pula tworzona przy pierwszym użyciu, czyli już w procesie roboczym serwera;
+        # 'spawn' zamiast 'fork', bo proces ma działające wątki
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+
+class LoginThrottle:
+    # Limity w oknie przesuwnym, przechowywane w pamięci procesu (bez zapytań do bazy)
+    def __init__(self, limit, window, maxsize=100000):
+        self.limit = limit
+        self.window = window
+        self._attempts = TTLCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+
+    def retry_after(self, key):
+        # Liczba sekund do odblokowania albo 0, jeśli limit nie został osiągnięty
+        with self._lock:
+            attempts = self._recent(key)
+            if len(attempts) < self.limit:
+                return 0
+            return max(1, int(attempts[0] + self.window - time.monotonic()) + 1)
+
+    def record(self, key):
+        with self._lock:
+            attempts = self._recent(key)
+            attempts.append(time.monotonic())
+            self._attempts.set(key, attempts)
+
+    def reset(self, key):
+        self._attempts.invalidate(key)
+
+    def _recent(self, key):
+        attempts = self._attempts.get(key) or deque()
+        cutoff = time.monotonic() - self.window
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        return attempts
@@ -0,0 +1,239 @@
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, event, exc, text
+
+from auth_cache import TTLCache
+from config import engine_options
+import metrics
+
+# Repliki bazy tylko do odczytu. Handlery oznaczone @read_replica wykonują zapytania na replice
+# wybranej przez ReplicaRouter (round-robin lub najmniej aktywnych żądań); zapisy (flush,
+# INSERT/UPDATE/DELETE) zawsze trafiają do serwera głównego. Po własnym zapisie użytkownik czyta
+# z serwera głównego przez REPLICA_STICKY_SECONDS (read-your-writes). Replika, na której wystąpił
+# błąd połączenia, jest wyłączana na REPLICA_RETRY_AFTER sekund, a żądanie ponawiane na serwerze
+# głównym; przed ponownym użyciem replika jest sprawdzana zapytaniem SELECT 1.
+
+read_routing = metrics.registry.register(metrics.Counter(
+    'db_read_routing_total', 'Żądania tylko do odczytu według bazy docelowej (primary lub replika)', ('target',)
+))
+
+
+def replica_health():
+    router = current_app.extensions.get('replica_router')
+    return {(name,): int(state['healthy']) for name, state in router.state().items()} if router else {}
+
+
+metrics.registry.register(metrics.Gauge('db_replica_healthy', 'Dostępność replik bazy (1 - dostępna)', ('replica',), collect=replica_health))
+
+
+def replica_binds(urls):
+    return {f"replica_{number}": {'url': url, **engine_options(url)} for number, url in enumerate(urls)}
+
+
+def is_write(clause):
+    if isinstance(clause, (Insert, Update, Delete)):
+        return True
+    # Zapytania, które muszą widzieć najnowsze dane (np. synchronizacja indeksu wyszukiwania)
+    return clause is not None and hasattr(clause, 'get_execution_options') and clause.get_execution_options().get('use_primary', False)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            name = g.get('db_replica')
+            if name and not is_write(clause):
+                return self._db.engines[name]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    def __init__(self, names, strategy='round_robin', retry_after=30, ping=None, logger=None):
+        if strategy not in ('round_robin', 'least_connections'):
+            raise ValueError(f"Nieznana strategia wyboru repliki: {strategy}")
+        self.names = list(names)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self.ping = ping
+        self.logger = logger
+        self._counter = itertools.count()
+        self._active = {name: 0 for name in self.names}
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def _pick(self):
+        now = time.monotonic()
+        with self._lock:
+            candidates = [name for name in self.names if self._down_until.get(name, 0) <= now]
+            if not candidates:
+                return None, False
+            start = next(self._counter)
+            if self.strategy == 'least_connections':
+                # Remisy rozstrzygane po kolei, aby ruch nie trafiał zawsze do pierwszej repliki
+                name = min(
+                    (candidates[(start + offset) % len(candidates)] for offset in range(len(candidates))),
+                    key=lambda name: self._active[name]
+                )
+            else:
+                name = candidates[start % len(candidates)]
+            self._active[name] += 1
+            return name, name in self._down_until
+
+    def acquire(self):
+        # Nazwa repliki dla żądania albo None (serwer główny), gdy żadna nie jest dostępna
+        for _ in range(len(self.names)):
+            name, recovering = self._pick()
+            if name is None:
+                return None
+            if not recovering:
+                return name
+            try:
+                self.ping(name)
+            except Exception:
+                self.release(name)
+                self.mark_down(name)
+                continue
+            with self._lock:
+                self._down_until.pop(name, None)
+            if self.logger:
+                self.logger.info(f"Replika {name} ponownie dostępna")
+            return name
+        return None
+
+    def release(self, name):
+        with self._lock:
+            self._active[name] -= 1
+
+    def mark_down(self, name):
+        with self._lock:
+            was_healthy = name not in self._down_until
+            self._down_until[name] = time.monotonic() + self.retry_after
+        if was_healthy and self.logger:
+            self.logger.warning(f"Replika {name} niedostępna - odczyty z serwera głównego przez {self.retry_after}s")
+
+    def state(self):
+        now = time.monotonic()
+        with self._lock:
+            return {name: {'healthy': self._down_until.get(name, 0) <= now, 'active': self._active[name]} for name in self.names}
+
+
+class MemoryStickiness:
+    # Znaczniki w obrębie procesu - przy wielu procesach lub węzłach API użyj redis
+    def __init__(self, seconds, maxsize=100000):
+        self._entries = TTLCache(maxsize=maxsize, ttl=seconds)
+
+    def mark(self, user_id):
+        self._entries.set(user_id, True)
+
+    def active(self, user_id):
+        return self._entries.get(user_id) is not None
+
+
+class RedisStickiness:
+    def __init__(self, client, seconds, prefix='crc:sticky:'):
+        self.client = client
+        self.seconds = seconds
+        self.prefix = prefix
+
+    def mark(self, user_id):
+        self.client.setex(f"{self.prefix}{user_id}", self.seconds, b'1')
+
+    def active(self, user_id):
+        return bool(self.client.exists(f"{self.prefix}{user_id}"))
+
+
+def create_stickiness(config):
+    backend = config['REPLICA_STICKY_BACKEND']
+    if backend == 'memory':
+        return MemoryStickiness(config['REPLICA_STICKY_SECONDS'])
+    if backend == 'redis':
+        # Zależność opcjonalna - potrzebna tylko dla znaczników współdzielonych przez procesy
+        import redis
+        return RedisStickiness(redis.Redis.from_url(config['REDIS_URL']), config['REPLICA_STICKY_SECONDS'])
+    raise ValueError(f"Nieznany backend znaczników read-your-writes: {backend}")
+
+
+def ping_replica(name):
+    with current_app.extensions['sqlalchemy'].engines[name].connect() as connection:
+        connection.execute(text('SELECT 1'))
+
+
+def note_commit(session):
+    # Wywoływane po zatwierdzeniu transakcji sesji - zapis w bieżącym żądaniu
+    if has_request_context():
+        g.db_committed = True
+
+
+def mark_writer(response):
+    user_id = g.get('current_user_id')
+    if g.pop('db_committed', False) and user_id is not None:
+        current_app.extensions['replica_stickiness'].mark(user_id)
+    return response
+
+
+def read_replica(f):
+    # Dekorator handlerów tylko do odczytu (pod @token_required)
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        router = current_app.extensions['replica_router']
+        user_id = g.get('current_user_id')
+        if router is None:
+            read_routing.inc(1, 'primary')
+            return f(*args, **kwargs)
+        if user_id is not None and current_app.extensions['replica_stickiness'].active(user_id):
+            # Również z pominięciem pamięci podręcznej odpowiedzi (response_cache.cached_response)
+            g.replica_sticky = True
+            read_routing.inc(1, 'primary')
+            return f(*args, **kwargs)
+
+        name = router.acquire()
+        if name is None:
+            read_routing.inc(1, 'primary')
+            return f(*args, **kwargs)
+
+        read_routing.inc(1, name)
+        g.db_replica = name
+        try:
+            response = f(*args, **kwargs)
+        finally:
+            g.db_replica = None
+            router.release(name)
+
+        if g.pop('db_replica_failed', False):
+            # Replika zawiodła w trakcie żądania - handler tylko czyta, więc można go powtórzyć
+            current_app.extensions['sqlalchemy'].session.rollback()
+            read_routing.inc(1, 'primary')
+            response = f(*args, **kwargs)
+        return response
+
+    return decorated
+
+
+def init_app(app, db):
+    names = [name for name in app.config.get('SQLALCHEMY_BINDS', {}) if name.startswith('replica_')]
+    app.extensions['replica_stickiness'] = create_stickiness(app.config)
+    app.extensions['replica_router'] = None
+    if not names:
+        return
+
+    router = ReplicaRouter(names, app.config['REPLICA_STRATEGY'], app.config['REPLICA_RETRY_AFTER'], ping=ping_replica, logger=app.logger)
+    app.extensions['replica_router'] = router
+    app.after_request(mark_writer)
+
+    with app.app_context():
+        for name in names:
+            event.listen(db.engines[name], 'handle_error', replica_error_handler(router, name))
+
+
+def replica_error_handler(router, name):
+    def handle_error(context):
+        # Błędy połączenia i błędy operacyjne (np. brak tabeli) wyłączają replikę; błędy zapytania nie
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, (exc.OperationalError, exc.InterfaceError)):
+            router.mark_down(name)
+            if has_request_context():
+                g.db_replica_failed = True
+    return handle_error
@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from auth_cache import TTLCache
+from serialization import negotiate_format
+
+# Pamięć podręczna odpowiedzi list z unieważnianiem przez numer generacji:
+# zapis do danej przestrzeni (np. 'members') zwiększa generację, przez co wszystkie
+# wcześniejsze klucze przestają być używane - bez przeglądania i usuwania wpisów.
+
+
+class MemoryResponseCache:
+    # Pamięć w obrębie procesu; inne procesy widzą zmiany najpóźniej po upływie TTL
+    name = 'memory'
+
+    def __init__(self, maxsize=1000, ttl=30):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._invalidated_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        return self._entries.get((namespace, self._generations.get(namespace, 0), key))
+
+    def set(self, namespace, key, value):
+        self._entries.set((namespace, self._generations.get(namespace, 0), key), value)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._invalidated_at[namespace] = time.monotonic()
+
+    def invalidated_within(self, namespace, seconds):
+        invalidated_at = self._invalidated_at.get(namespace)
+        return invalidated_at is not None and time.monotonic() - invalidated_at < seconds
+
+    def stats(self):
+        return self._entries.stats()
+
+
+class RedisResponseCache:
+    # Pamięć współdzielona przez wszystkie procesy i węzły API (Redis lub zgodny serwer)
+    name = 'redis'
+
+    # v2: wpis to ETag, typ zawartości i treść - wpisy w starym formacie nie są odczytywane
+    def __init__(self, client, ttl=30, prefix='crc:cache:v2:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, namespace, key):
+        generation = self.client.get(f'{self.prefix}{namespace}:generation') or b'0'
+        if isinstance(generation, bytes):
+            generation = generation.decode('ascii')
+        return f'{self.prefix}{namespace}:{generation}:{key}'
+
+    def get(self, namespace, key):
+        raw = self.client.get(self._key(namespace, key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, content_type, body = raw.split(b'\n', 2)
+        return etag.decode('ascii'), content_type.decode('ascii'), body
+
+    def set(self, namespace, key, value):
+        etag, content_type, body = value
+        self.client.setex(self._key(namespace, key), self.ttl, etag.encode('ascii') + b'\n' + content_type.encode('ascii') + b'\n' + body)
+
+    def invalidate(self, namespace):
+        self.client.incr(f'{self.prefix}{namespace}:generation')
+        self.client.set(f'{self.prefix}{namespace}:invalidated_at', repr(time.time()))
+
+    def invalidated_within(self, namespace, seconds):
+        invalidated_at = self.client.get(f'{self.prefix}{namespace}:invalidated_at')
+        return invalidated_at is not None and time.time() - float(invalidated_at) < seconds
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+class NullResponseCache:
+    name = 'none'
+
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value):
+        pass
+
+    def invalidate(self, namespace):
+        pass
+
+    def invalidated_within(self, namespace, seconds):
+        return False
+
+    def stats(self):
+        return {}
+
+
+def create_response_cache(config):
+    backend = config['RESPONSE_CACHE_BACKEND']
+    if backend == 'memory':
+        return MemoryResponseCache(maxsize=config['RESPONSE_CACHE_SIZE'], ttl=config['RESPONSE_CACHE_TTL'])
+    if backend == 'redis':
+        # Zależność opcjonalna - potrzebna tylko dla współdzielonej pamięci podręcznej
+        import redis
+        return RedisResponseCache(redis.Redis.from_url(config['REDIS_URL']), ttl=config['RESPONSE_CACHE_TTL'])
+    if backend == 'none':
+        return NullResponseCache()
+    raise ValueError(f"Nieznany backend pamięci podręcznej odpowiedzi: {backend}")
+
+
+def cache_key(fmt='json'):
+    # Klucz z parametrów zapytania niezależny od ich kolejności (i formatu odpowiedzi z nagłówka Accept)
+    return fmt + ':' + '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+
+
+def cached_response(namespace):
+    # Dekorator: odpowiedź 200 zapisywana z silnym ETag; kolejne żądania dostają ją z pamięci
+    # podręcznej albo 304, gdy klient ma aktualną wersję
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            cache = current_app.extensions['response_cache']
+            # Użytkownik tuż po własnym zapisie (read-your-writes, replicas.py) czyta z serwera głównego
+            # z pominięciem pamięci podręcznej - wpis mógł powstać z opóźnionej repliki
+            if g.get('replica_sticky'):
+                response = make_response(f(*args, **kwargs))
+                response.headers['X-Cache'] = 'BYPASS'
+                return response
+
+            fmt = negotiate_format()
+            key = cache_key(fmt)
+            cached = cache.get(namespace, key)
+
+            if cached is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                # Odpowiedź z repliki tuż po unieważnieniu może nie zawierać tej zmiany - bez zapisu
+                # (replika nadąża najpóźniej po REPLICA_STICKY_SECONDS)
+                stale = g.get('db_replica') and cache.invalidated_within(namespace, current_app.config['REPLICA_STICKY_SECONDS'])
+                if not stale:
+                    # Typ zawartości zapisywany z treścią - handler mógł zwrócić JSON mimo innego Accept
+                    cache.set(namespace, key, (etag, response.content_type, body))
+                response.headers['X-Cache'] = 'MISS'
+            else:
+                etag, content_type, body = cached
+                response = current_app.response_class(body, content_type=content_type)
+                response.vary.add('Accept')
+                response.headers['X-Cache'] = 'HIT'
+
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,414 @@
+import datetime
+import re
+import threading
+import time
+import traceback
+from collections import defaultdict
+
+from sqlalchemy import func, select, text
+
+from auth_cache import TTLCache
+
+# Wyszukiwanie członków z wymiennym backendem:
+#   ilike    - dotychczasowe ILIKE '%fraza%' (pełny skan tabeli)
+#   ngram    - indeks odwrócony n-gramów w pamięci każdego procesu, rankingowany
+#   fulltext - natywne wyszukiwanie pełnotekstowe bazy (MSSQL / PostgreSQL)
+
+NGRAM_SIZE = 3
+
+# Wagi pól (first_name, last_name, email) przy ustalaniu rankingu
+FIELD_WEIGHTS = (2, 3, 1)
+
+# Co ile sekund indeks n-gramów dociąga zmiany z innych procesów (po updated_at)
+DEFAULT_SYNC_INTERVAL = 5
+
+# Powyżej tej liczby członków indeks nie jest budowany (pamięć każdego procesu roboczego)
+DEFAULT_MAX_MEMBERS = 100000
+
+# Zapamiętane wyniki fraz (lista id w kolejności rankingu), czyszczone przy każdej zmianie indeksu
+RESULT_CACHE_SIZE = 32
+RESULT_CACHE_TTL = 60
+
+
+def normalize(value):
+    return (value or '').lower()
+
+
+def ngrams(value, size=NGRAM_SIZE):
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def score_fields(fields, term):
+    score = 0
+    for weight, value in zip(FIELD_WEIGHTS, fields):
+        if value == term:
+            score += 4 * weight
+        elif value.startswith(term):
+            score += 2 * weight
+        elif term in value:
+            score += weight
+    return score
+
+
+class NgramIndex:
+    def __init__(self, size=NGRAM_SIZE):
+        self.size = size
+        self._lock = threading.RLock()
+        self._postings = defaultdict(set)
+        self._documents = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, doc_id, fields, status=None):
+        normalized = tuple(normalize(value) for value in fields)
+        with self._lock:
+            self._discard(doc_id)
+            for gram in self._grams(normalized):
+                self._postings[gram].add(doc_id)
+            self._documents[doc_id] = (normalized, status)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._discard(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+
+    def search(self, term, status=None):
+        term = normalize(term)
+        if len(term) < self.size:
+            # Za krótka fraza - n-gramy nic nie zawężą
+            return None
+
+        query_grams = sorted(ngrams(term, self.size), key=lambda gram: len(self._postings.get(gram, ())))
+        with self._lock:
+            # Przecięcie list zaczynając od najrzadszego n-gramu
+            candidates = None
+            for gram in query_grams:
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                candidates = set(posting) if candidates is None else candidates & posting
+                if not candidates:
+                    return []
+
+            # Weryfikacja dopasowania (eliminuje fałszywe trafienia n-gramów) i ranking
+            ranked = []
+            for doc_id in candidates:
+                fields, doc_status = self._documents[doc_id]
+                if status and doc_status != status:
+                    continue
+                score = score_fields(fields, term)
+                if score:
+                    ranked.append((score, doc_id))
+
+        ranked.sort(reverse=True)
+        return [doc_id for _, doc_id in ranked]
+
+    def _grams(self, fields):
+        grams = set()
+        for value in fields:
+            grams |= ngrams(value, self.size)
+        return grams
+
+    def _discard(self, doc_id):
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for gram in self._grams(document[0]):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+
+class SearchBackend:
+    name = 'ilike'
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+
+    def filter_clause(self, term):
+        pattern = f"%{term}%"
+        return (
+            (self.model.first_name.ilike(pattern)) |
+            (self.model.last_name.ilike(pattern)) |
+            (self.model.email.ilike(pattern))
+        )
+
+    # Zwraca (lista id w kolejności rankingu, liczba wyników) albo None,
+    # jeśli backend nie obsłuży frazy i należy użyć filter_clause
+    def search(self, term, status=None, offset=0, limit=10, count=True):
+        return None
+
+    def index_member(self, member):
+        pass
+
+    def remove_member(self, member_id):
+        pass
+
+    def create_index(self):
+        pass
+
+    def start(self):
+        pass
+
+
+class NgramSearchBackend(SearchBackend):
+    # Indeks w pamięci każdego procesu roboczego (około 2 KB na członka) - budowany i odświeżany
+    # przez wątek w tle; do czasu zbudowania, a przy liczbie członków powyżej max_members zawsze,
+    # wyszukiwanie korzysta z ILIKE
+    name = 'ngram'
+
+    def __init__(self, db, model, app=None, change_model=None, sync_interval=DEFAULT_SYNC_INTERVAL,
+                 max_members=DEFAULT_MAX_MEMBERS):
+        super().__init__(db, model)
+        self.app = app
+        # Dziennik zmian (change_feed.py) - członków usuniętych na stałe nie da się odczytać po updated_at
+        self.change_model = change_model
+        self.index = NgramIndex()
+        self.sync_interval = sync_interval
+        self.max_members = max_members
+        self._built = False
+        self._disabled = False
+        self._build_lock = threading.Lock()
+        self._synced_at = None
+        self._last_sync_check = 0.0
+        self._change_seq = self._change_floor = 0
+        # Uszeregowane wyniki popularnych fraz - kolejne strony bez ponownego rankingu wszystkich trafień
+        self._results = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def start(self):
+        # Wątek indeksu uruchamiany w procesie roboczym (nie przed fork): przy starcie procesu
+        # (gunicorn post_worker_init), a pod innym serwerem - przy pierwszym wyszukiwaniu
+        if self.app is None or self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run_forever, name='search-index', daemon=True)
+            self._thread.start()
+
+    def run_forever(self):
+        while not self._disabled:
+            try:
+                with self.app.app_context():
+                    if not self._built:
+                        started = time.perf_counter()
+                        if self.rebuild():
+                            self.app.logger.info(f"Indeks wyszukiwania: {len(self.index)} członków w {time.perf_counter() - started:.1f}s")
+                    else:
+                        with self._build_lock:
+                            self._load(self._synced_at)
+                        if self.max_members and len(self.index) > self.max_members:
+                            self._disable()
+                if self._disabled:
+                    self.app.logger.warning(
+                        f"Indeks wyszukiwania wyłączony: więcej niż {self.max_members} członków (SEARCH_NGRAM_MAX_MEMBERS) - wyszukiwanie przez ILIKE"
+                    )
+                    return
+            except Exception:
+                self.app.logger.warning(f"Błąd indeksu wyszukiwania: {traceback.format_exc()}")
+            time.sleep(self.sync_interval)
+
+    def search(self, term, status=None, offset=0, limit=10, count=True):
+        if self.app is None:
+            self._ensure_current()
+        else:
+            self.start()
+        if not self._built:
+            return None
+        key = (normalize(term), status or None)
+        ids = self._results.get(key)
+        if ids is None:
+            ids = self.index.search(term, status or None)
+            if ids is None:
+                return None
+            self._results.set(key, ids)
+        return ids[offset:offset + limit], len(ids)
+
+    def index_member(self, member):
+        if self._built:
+            self.index.add(member.id, (member.first_name, member.last_name, member.email), member.status)
+            self._results.clear()
+
+    def remove_member(self, member_id):
+        if self._built:
+            self.index.remove(member_id)
+            self._results.clear()
+
+    def rebuild(self):
+        # Zwraca False, gdy indeks przekroczyłby max_members (i pozostaje wyłączony)
+        with self._build_lock:
+            self._built = False
+            self.index.clear()
+            self._results.clear()
+            if self.max_members and self.db.session.query(func.count(self.model.id)).scalar() > self.max_members:
+                self._disabled = True
+                return False
+            self._load(None)
+            self._built = True
+            return True
+
+    def _disable(self):
+        self._disabled = True
+        self._built = False
+        self.index.clear()
+        self._results.clear()
+
+    def _ensure_current(self):
+        # Bez aplikacji (np. testy wydajności) - budowa i synchronizacja w wątku wywołującym
+        if self._disabled:
+            return
+        if not self._built:
+            self.rebuild()
+        elif time.monotonic() - self._last_sync_check >= self.sync_interval:
+            with self._build_lock:
+                if time.monotonic() - self._last_sync_check >= self.sync_interval:
+                    self._load(self._synced_at)
+
+    def _load(self, since):
+        # Znacznik ustawiany przed odczytem, aby nie zgubić zmian zapisanych w trakcie
+        started_at = datetime.datetime.utcnow()
+        model = self.model
+        change_seq = self._read_change_seq()
+        # Zawsze z serwera głównego - opóźniona replika zgubiłaby zmiany sprzed znacznika since
+        # Przy synchronizacji także członkowie usunięci w innych procesach (usunięcie miękkie zmienia updated_at)
+        query = self.db.session.query(
+            model.id, model.first_name, model.last_name, model.email, model.status, model.deleted_at
+        ).execution_options(use_primary=True, include_deleted=since is not None)
+        if since is not None:
+            query = query.filter(model.updated_at >= since)
+
+        changed = False
+        for row in query.yield_per(10000):
+            changed = True
+            if row.deleted_at is not None:
+                self.index.remove(row.id)
+            else:
+                self.index.add(row.id, (row.first_name, row.last_name, row.email), row.status)
+
+        if since is not None and self.change_model is not None:
+            # Członkowie usunięci w innych procesach, których dane zadanie w tle zdążyło już usunąć z bazy
+            change = self.change_model
+            deleted = self.db.session.execute(
+                select(change.member_id).where(change.id > self._change_floor, change.action == 'deleted')
+                .execution_options(use_primary=True)
+            )
+            for (member_id,) in deleted:
+                changed = True
+                self.index.remove(member_id)
+        if changed:
+            self._results.clear()
+        # Kolejna synchronizacja czyta dziennik od numeru sprzed tej - wpis z niższym numerem
+        # może zostać zatwierdzony dopiero po odczycie (trwająca transakcja)
+        self._change_floor, self._change_seq = (change_seq, change_seq) if since is None else (self._change_seq, change_seq)
+        self._synced_at = started_at - datetime.timedelta(seconds=1)
+        self._last_sync_check = time.monotonic()
+
+    def _read_change_seq(self):
+        if self.change_model is None:
+            return 0
+        return self.db.session.execute(
+            select(func.max(self.change_model.id)).execution_options(use_primary=True)
+        ).scalar() or 0
+
+
+class FullTextSearchBackend(SearchBackend):
+    name = 'fulltext'
+
+    MSSQL_SEARCH = """
+        SELECT m.id FROM member m
+        JOIN CONTAINSTABLE(member, (first_name, last_name, email), :query) ft ON m.id = ft.[KEY]
+        WHERE (:status = '' OR m.status = :status) AND m.deleted_at IS NULL
+        ORDER BY ft.RANK DESC, m.id DESC
+        OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY
+    """
+    MSSQL_COUNT = """
+        SELECT COUNT(*) FROM member m
+        JOIN CONTAINSTABLE(member, (first_name, last_name, email), :query) ft ON m.id = ft.[KEY]
+        WHERE (:status = '' OR m.status = :status) AND m.deleted_at IS NULL
+    """
+    MSSQL_CREATE_INDEX = [
+        "IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'member_catalog') "
+        "CREATE FULLTEXT CATALOG member_catalog AS DEFAULT",
+        "IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('member')) "
+        "BEGIN "
+        "DECLARE @pk sysname = (SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID('member') AND is_primary_key = 1); "
+        "EXEC('CREATE FULLTEXT INDEX ON member(first_name, last_name, email) KEY INDEX ' + @pk + ' WITH CHANGE_TRACKING AUTO'); "
+        "END",
+    ]
+
+    PG_DOCUMENT = "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, ''))"
+    PG_SEARCH = f"""
+        SELECT id FROM member
+        WHERE {PG_DOCUMENT} @@ to_tsquery('simple', :query)
+          AND (:status = '' OR status = :status) AND deleted_at IS NULL
+        ORDER BY ts_rank({PG_DOCUMENT}, to_tsquery('simple', :query)) DESC, id DESC
+        OFFSET :offset LIMIT :limit
+    """
+    PG_COUNT = f"""
+        SELECT COUNT(*) FROM member
+        WHERE {PG_DOCUMENT} @@ to_tsquery('simple', :query)
+          AND (:status = '' OR status = :status) AND deleted_at IS NULL
+    """
+    PG_CREATE_INDEX = [
+        f"CREATE INDEX IF NOT EXISTS ix_member_fulltext ON member USING gin ({PG_DOCUMENT})",
+    ]
+
+    def search(self, term, status=None, offset=0, limit=10, count=True):
+        dialect = self.db.engine.dialect.name
+        words = re.findall(r'\w+', term)
+        if not words:
+            return None
+
+        if dialect == 'mssql':
+            query = ' AND '.join(f'"{word}*"' for word in words)
+            search_sql, count_sql = self.MSSQL_SEARCH, self.MSSQL_COUNT
+        elif dialect == 'postgresql':
+            query = ' & '.join(f"{word}:*" for word in words)
+            search_sql, count_sql = self.PG_SEARCH, self.PG_COUNT
+        else:
+            # Brak natywnego pełnotekstowego - zostaje ILIKE
+            return None
+
+        params = {'query': query, 'status': status or '', 'offset': offset, 'limit': limit}
+        ids = [row[0] for row in self.db.session.execute(text(search_sql), params)]
+        total = self.db.session.execute(text(count_sql), params).scalar() if count else None
+        return ids, total
+
+    def create_index(self):
+        dialect = self.db.engine.dialect.name
+        statements = {'mssql': self.MSSQL_CREATE_INDEX, 'postgresql': self.PG_CREATE_INDEX}.get(dialect, [])
+        if not statements:
+            return False
+
+        # Indeksy pełnotekstowe MSSQL nie mogą powstawać wewnątrz transakcji
+        with self.db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        return True
+
+
+SEARCH_BACKENDS = {
+    SearchBackend.name: SearchBackend,
+    NgramSearchBackend.name: NgramSearchBackend,
+    FullTextSearchBackend.name: FullTextSearchBackend,
+}
+
+
+def create_search_backend(name, db, model, **options):
+    try:
+        backend_class = SEARCH_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Nieznany backend wyszukiwania: {name}")
+    if backend_class is not NgramSearchBackend:
+        return backend_class(db, model)
+    return backend_class(db, model, **options)
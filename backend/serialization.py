@@ -0,0 +1,85 @@
+import datetime
+import json
+
+from flask import current_app, request
+
+# Szybka ścieżka serializacji list członków: kolumny pobierane z bazy jako krotki (bez obiektów ORM),
+# zamiana na słowniki bez pośrednich kroków i kodowanie szybkim koderem JSON (orjson, jeśli
+# zainstalowany) albo MessagePack, gdy klient o to poprosi nagłówkiem Accept.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MEMBER_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'postal_code',
+    'status', 'join_date', 'party_role', 'notes', 'created_at', 'updated_at'
+]
+SUMMARY_FIELDS = ['id', 'first_name', 'last_name', 'email', 'phone', 'status', 'join_date', 'party_role']
+
+MIMETYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/x-msgpack',
+}
+
+
+def parse_fields(value, default):
+    # Zwraca (lista pól, None) albo (None, komunikat błędu); kolejność jak w żądaniu
+    if not value:
+        return default, None
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in MEMBER_FIELDS]
+    if unknown or not fields:
+        return None, f"Nieznane pola: {', '.join(unknown) or 'brak pól'}"
+    return fields, None
+
+
+def select_columns(model, fields, required=()):
+    # Kolumny do zapytania: żądane pola oraz pola potrzebne do obsługi żądania (np. kursor)
+    names = list(dict.fromkeys(list(fields) + list(required)))
+    return names, [getattr(model, name) for name in names]
+
+
+def plain_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def rows_to_dicts(rows, names, fields):
+    # Wiersze (krotki kolumn w kolejności names) -> słowniki tylko z żądanymi polami
+    positions = [(field, names.index(field)) for field in fields]
+    return [{field: plain_value(row[position]) for field, position in positions} for row in rows]
+
+
+def negotiate_format():
+    best = request.accept_mimetypes.best_match([MIMETYPES['json'], 'application/msgpack', MIMETYPES['msgpack']])
+    if best in ('application/msgpack', MIMETYPES['msgpack']) and msgpack_module() is not None:
+        return 'msgpack'
+    return 'json'
+
+
+def msgpack_module():
+    # Zależność opcjonalna - bez niej odpowiedzi są zawsze w JSON
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def encode(data, fmt='json'):
+    if fmt == 'msgpack':
+        return msgpack_module().packb(data, use_bin_type=True, default=plain_value)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=plain_value).encode('utf-8')
+
+
+def payload_response(data, status=200):
+    # Odpowiedź w formacie wybranym przez klienta (Accept), bez sortowania kluczy jak w jsonify
+    fmt = negotiate_format()
+    response = current_app.response_class(encode(data, fmt), status=status, mimetype=MIMETYPES[fmt])
+    response.vary.add('Accept')
+    return response
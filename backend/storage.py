@@ -0,0 +1,220 @@
+import contextlib
+import os
+import shutil
+import tempfile
+
+from blob_store import CHUNK_SIZE, remove_quietly
+
+# Magazyn plików dokumentów. Rekordy w bazie przechowują klucz (np. "blobs/ab/cd/abcd..."),
+# a nie ścieżkę, więc ten sam rekord jest czytelny na każdym węźle API. Klucz wynika ze skrótu
+# SHA-256 treści: identyczne pliki są przechowywane raz, a katalogi dzielone dwoma poziomami
+# prefiksu skrótu pozostają małe niezależnie od liczby plików.
+
+DERIVED_SUFFIXES = ('thumb.png', 'txt')
+
+
+def blob_key(sha256):
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def derived_key(key, suffix):
+    # Pliki pochodne (miniatura, wyodrębniony tekst) obok bloba - wspólne dla identycznych treści
+    return f"{key}.{suffix}"
+
+
+class LocalStorage:
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def path(self, key):
+        path = os.path.abspath(os.path.join(self.root, *key.split('/')))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Nieprawidłowy klucz pliku: {key}")
+        return path
+
+    def save(self, source_path, key):
+        # Przenosi plik lokalny (np. plik częściowy przesyłania) pod klucz
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(source_path, path)
+
+    def open(self, key):
+        return open(self.path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key):
+        remove_quietly(self.path(key))
+
+    def delete_many(self, keys):
+        for key in keys:
+            remove_quietly(self.path(key))
+
+    def iter_keys(self):
+        # (klucz, czas modyfikacji, rozmiar) wszystkich plików pod katalogiem magazynu
+        for directory, _, filenames in os.walk(self.root):
+            relative = os.path.relpath(directory, self.root)
+            prefix = '' if relative == '.' else relative.replace(os.sep, '/') + '/'
+            for filename in filenames:
+                try:
+                    stat = os.stat(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    continue
+                yield prefix + filename, stat.st_mtime, stat.st_size
+
+    def local_path(self, key):
+        return self.path(key)
+
+    @contextlib.contextmanager
+    def local_file(self, key):
+        yield self.path(key)
+
+
+class S3Storage:
+    # Magazyn zgodny z S3 (AWS S3, MinIO, Ceph); klient to boto3.client('s3') lub zgodny zamiennik
+    name = 's3'
+
+    def __init__(self, client, bucket, prefix='', temp_dir=None):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.temp_dir = temp_dir
+
+    def object_key(self, key):
+        return self.prefix + key
+
+    def save(self, source_path, key):
+        self.client.upload_file(source_path, self.bucket, self.object_key(key))
+        remove_quietly(source_path)
+
+    def open(self, key, byte_range=None):
+        # Strumień treści obiektu (opcjonalnie zakres bajtów "start-koniec")
+        params = {'Bucket': self.bucket, 'Key': self.object_key(key)}
+        if byte_range:
+            params['Range'] = f"bytes={byte_range}"
+        return self.client.get_object(**params)['Body']
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as e:
+            if error_code(e) in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    def size(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))['ContentLength']
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def delete_many(self, keys):
+        # Jedno żądanie DeleteObjects na maksymalnie 1000 kluczy
+        keys = list(keys)
+        for start in range(0, len(keys), 1000):
+            response = self.client.delete_objects(Bucket=self.bucket, Delete={
+                'Objects': [{'Key': self.object_key(key)} for key in keys[start:start + 1000]],
+                'Quiet': True
+            })
+            # W trybie Quiet odpowiedź zawiera tylko klucze, których nie udało się usunąć
+            errors = response.get('Errors', [])
+            if errors:
+                raise OSError(f"Nie udało się usunąć {len(errors)} obiektów, np. {errors[0].get('Key')}: {errors[0].get('Message')}")
+
+    def iter_keys(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                yield item['Key'][len(self.prefix):], item['LastModified'].timestamp(), item['Size']
+
+    def local_path(self, key):
+        return None
+
+    @contextlib.contextmanager
+    def local_file(self, key):
+        # Kopia tymczasowa dla narzędzi wymagających pliku na dysku (skaner, miniatury)
+        handle, path = tempfile.mkstemp(dir=self.temp_dir)
+        os.close(handle)
+        try:
+            self.client.download_file(self.bucket, self.object_key(key), path)
+            yield path
+        finally:
+            remove_quietly(path)
+
+    def presigned_url(self, key, ttl, filename=None, mimetype=None):
+        params = {'Bucket': self.bucket, 'Key': self.object_key(key)}
+        if filename:
+            params['ResponseContentDisposition'] = f'attachment; filename="{filename}"'
+        if mimetype:
+            params['ResponseContentType'] = mimetype
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=ttl)
+
+
+def error_code(error):
+    return str(getattr(error, 'response', {}).get('Error', {}).get('Code', ''))
+
+
+def delete_with_derived(storage, key):
+    storage.delete(key)
+    for suffix in DERIVED_SUFFIXES:
+        storage.delete(derived_key(key, suffix))
+
+
+def with_derived(key):
+    return [key] + [derived_key(key, suffix) for suffix in DERIVED_SUFFIXES]
+
+
+def base_key(key):
+    # Klucz bloba, do którego należy plik pochodny (dla pozostałych - ten sam klucz)
+    for suffix in DERIVED_SUFFIXES:
+        if key.endswith(f".{suffix}"):
+            return key[:-len(suffix) - 1]
+    return key
+
+
+def save_bytes(storage, data, key, temp_dir=None):
+    # Zapis danych (np. miniatury) przez plik tymczasowy - obiekt pojawia się w całości albo wcale
+    handle, path = tempfile.mkstemp(dir=temp_dir)
+    try:
+        with os.fdopen(handle, 'wb') as target:
+            target.write(data)
+        storage.save(path, key)
+    finally:
+        remove_quietly(path)
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE):
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+def create_storage(config):
+    backend = config['STORAGE_BACKEND']
+    temp_dir = os.path.join(config['UPLOAD_FOLDER'], 'tmp')
+    if backend == 'local':
+        return LocalStorage(config['STORAGE_LOCAL_ROOT'] or config['UPLOAD_FOLDER'])
+    if backend == 's3':
+        # Zależność opcjonalna - potrzebna tylko dla magazynu S3
+        import boto3
+        client = boto3.client(
+            's3',
+            endpoint_url=config['S3_ENDPOINT_URL'] or None,
+            region_name=config['S3_REGION'] or None,
+            aws_access_key_id=config['S3_ACCESS_KEY'] or None,
+            aws_secret_access_key=config['S3_SECRET_KEY'] or None
+        )
+        return S3Storage(client, config['S3_BUCKET'], prefix=config['S3_PREFIX'], temp_dir=temp_dir)
+    raise ValueError(f"Nieznany magazyn plików: {backend}")
@@ -3,7 +3,7 @@ import { FileText, Download, Trash2 } from 'lucide-react';
 import { toast } from 'react-toastify';
 import { documentsApi } from '../../services/api';
 
-interface Document {
+export interface Document {
   id: number;
   filename: string;
   document_type: string;
@@ -13,17 +13,24 @@ interface Document {
 
 interface DocumentsListProps {
   memberId: number;
+  // Documents loaded together with the member; fetched separately only after an upload
+  initialDocuments?: Document[];
   refreshTrigger: number;
 }
 
-const DocumentsList = ({ memberId, refreshTrigger }: DocumentsListProps) => {
-  const [documents, setDocuments] = useState<Document[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
+const DocumentsList = ({ memberId, initialDocuments, refreshTrigger }: DocumentsListProps) => {
+  const [documents, setDocuments] = useState<Document[]>(initialDocuments || []);
+  const [isLoading, setIsLoading] = useState(!initialDocuments);
   const [isDeleting, setIsDeleting] = useState<number | null>(null);
 
   useEffect(() => {
+    if (initialDocuments && refreshTrigger === 0) {
+      setDocuments(initialDocuments);
+      setIsLoading(false);
+      return;
+    }
     fetchDocuments();
-  }, [memberId, refreshTrigger]);
+  }, [memberId, initialDocuments, refreshTrigger]);
 
   const fetchDocuments = async () => {
     try {
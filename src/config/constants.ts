@@ -8,6 +8,10 @@ export const APP_VERSION = '1.0.0';
 // Pagination
 export const ITEMS_PER_PAGE = 10;
 
+// Change feed: polling interval when the server does not stream, and delay before reopening a closed stream
+export const CHANGES_POLL_INTERVAL_MS = 5000;
+export const CHANGES_RECONNECT_MS = 3000;
+
 // Document types
 export const DOCUMENT_TYPES = [
   'Wniosek o członkostwo',
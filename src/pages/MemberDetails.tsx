@@ -5,13 +5,14 @@ import { toast } from 'react-toastify';
 import { membersApi } from '../services/api';
 import { Member } from '../components/members/MemberForm';
 import DocumentUpload from '../components/documents/DocumentUpload';
-import DocumentsList from '../components/documents/DocumentsList';
+import DocumentsList, { Document } from '../components/documents/DocumentsList';
 
 const MemberDetails = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
   
   const [member, setMember] = useState<Member | null>(null);
+  const [documents, setDocuments] = useState<Document[] | undefined>(undefined);
   const [isLoading, setIsLoading] = useState(true);
   const [isDeleting, setIsDeleting] = useState(false);
   const [documentsRefreshTrigger, setDocumentsRefreshTrigger] = useState(0);
@@ -25,8 +26,15 @@ const MemberDetails = () => {
   const fetchMember = async (memberId: number) => {
     try {
       setIsLoading(true);
-      const data = await membersApi.getMember(memberId);
-      setMember(data.member);
+      // Member and documents in one request
+      const data = await membersApi.getMembersBatch([memberId], true);
+      const [found] = data.members;
+      if (!found) {
+        throw new Error('Member not found');
+      }
+      const { documents: memberDocuments, ...memberData } = found;
+      setMember(memberData);
+      setDocuments(memberDocuments);
     } catch (error) {
       console.error('Błąd podczas pobierania członka:', error);
       toast.error('Nie udało się załadować danych członka');
@@ -238,6 +246,7 @@ const MemberDetails = () => {
         <div className="md:col-span-3">
           <DocumentsList
             memberId={parseInt(id!)}
+            initialDocuments={documents}
             refreshTrigger={documentsRefreshTrigger}
           />
         </div>
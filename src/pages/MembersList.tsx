@@ -1,8 +1,8 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, Plus, UserX, Edit, Eye, Trash2, ChevronLeft, ChevronRight } from 'lucide-react';
 import { toast } from 'react-toastify';
-import { membersApi } from '../services/api';
+import { membersApi, changesApi } from '../services/api';
 import { ITEMS_PER_PAGE, MEMBER_STATUSES } from '../config/constants';
 
 interface Member {
@@ -24,10 +24,39 @@ const MembersList = () => {
   const [isDeleting, setIsDeleting] = useState<number | null>(null);
   const [statusFilter, setStatusFilter] = useState('Wszystkie');
 
+  // Current view for the change feed handler (the subscription is opened once)
+  const viewRef = useRef({ currentPage, searchTerm, statusFilter });
+  viewRef.current = { currentPage, searchTerm, statusFilter };
+
   useEffect(() => {
     fetchMembers();
   }, [currentPage, searchTerm, statusFilter]);
 
+  // Live updates from the server change feed instead of re-fetching the list
+  useEffect(() => {
+    // Through the ref: a reset reloads the page, search and filter shown now, not those of the first render
+    const source = changesApi.subscribe(applyChange, () => fetchMembersRef.current());
+    return () => source.close();
+  }, []);
+
+  const applyChange = (change: any) => {
+    const view = viewRef.current;
+    const member: Member | null = change.member;
+    const matchesFilter = member && (view.statusFilter === 'Wszystkie' || member.status === view.statusFilter);
+    
+    if (change.action === 'deleted') {
+      setMembers(current => current.filter(item => item.id !== change.member_id));
+    } else if (change.action === 'updated' && member) {
+      setMembers(current => matchesFilter
+        ? current.map(item => item.id === member.id ? member : item)
+        : current.filter(item => item.id !== member.id));
+    } else if (change.action === 'created' && member && view.currentPage === 1 && !view.searchTerm && matchesFilter) {
+      setMembers(current => current.some(item => item.id === member.id)
+        ? current
+        : [member, ...current].slice(0, ITEMS_PER_PAGE));
+    }
+  };
+
   const fetchMembers = async () => {
     try {
       setIsLoading(true);
@@ -48,6 +77,9 @@ const MembersList = () => {
     }
   };
 
+  const fetchMembersRef = useRef(fetchMembers);
+  fetchMembersRef.current = fetchMembers;
+
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
     setCurrentPage(1);
@@ -1,6 +1,6 @@
 import axios from 'axios';
 import { toast } from 'react-toastify';
-import { API_URL } from '../config/constants';
+import { API_URL, CHANGES_POLL_INTERVAL_MS, CHANGES_RECONNECT_MS } from '../config/constants';
 
 // Configure axios
 axios.defaults.baseURL = API_URL;
@@ -58,6 +58,18 @@ export const membersApi = {
     }
   },
   
+  // Get several members in one request, optionally with their documents
+  getMembersBatch: async (ids: number[], includeDocuments = false) => {
+    try {
+      const response = await axios.get('/members', {
+        params: { ids: ids.join(','), include: includeDocuments ? 'documents' : undefined }
+      });
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+  
   // Get a single member by ID
   getMember: async (id: number) => {
     try {
@@ -99,6 +111,110 @@ export const membersApi = {
   }
 };
 
+// API service for the member change feed (replaces polling the members list)
+export const changesApi = {
+  // Long-poll: waits up to `timeout` seconds for changes after `since`; without `since` returns the current position
+  getChanges: async (since?: number, timeout?: number) => {
+    try {
+      const response = await axios.get('/changes', { params: { since, timeout } });
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+  
+  // Single-use, short-lived ticket for the stream (EventSource cannot send the Authorization header)
+  getStreamTicket: async () => {
+    try {
+      const response = await axios.post('/changes/ticket');
+      return response.data.ticket as string;
+    } catch (error) {
+      throw error;
+    }
+  },
+  
+  // Follows the feed from the current position: a server-sent events stream when the server offers one,
+  // otherwise polling without waiting (a waiting request would hold a server thread)
+  subscribe: (onChange: (change: any) => void, onReset: () => void) => {
+    let closed = false;
+    let since: number | undefined;
+    let source: EventSource | null = null;
+    let timer: number | undefined;
+    
+    const schedule = (next: () => void, delay: number) => {
+      if (!closed) {
+        timer = window.setTimeout(next, delay);
+      }
+    };
+    
+    const openStream = async () => {
+      try {
+        const ticket = await changesApi.getStreamTicket();
+        if (closed) {
+          return;
+        }
+        const params = new URLSearchParams({ ticket, since: String(since) });
+        source = new EventSource(`${API_URL}/changes/stream?${params.toString()}`);
+        source.addEventListener('change', event => {
+          const change = JSON.parse((event as MessageEvent).data);
+          since = change.seq;
+          onChange(change);
+        });
+        source.addEventListener('reset', event => {
+          since = Number((event as MessageEvent).lastEventId);
+          onReset();
+        });
+        // The ticket is spent, so the browser's own reconnect would be rejected - reopen with a new one
+        source.onerror = () => {
+          source?.close();
+          source = null;
+          schedule(openStream, CHANGES_RECONNECT_MS);
+        };
+      } catch (error) {
+        schedule(openStream, CHANGES_RECONNECT_MS);
+      }
+    };
+    
+    const poll = async () => {
+      try {
+        const data = await changesApi.getChanges(since, 0);
+        if (data.reset) {
+          onReset();
+        } else {
+          data.changes.forEach(onChange);
+        }
+        since = data.last_seq;
+      } catch (error) {
+        // Next attempt after the usual interval
+      }
+      schedule(poll, CHANGES_POLL_INTERVAL_MS);
+    };
+    
+    const start = async () => {
+      try {
+        const data = await changesApi.getChanges();
+        since = data.last_seq;
+        if (data.stream) {
+          openStream();
+        } else {
+          schedule(poll, CHANGES_POLL_INTERVAL_MS);
+        }
+      } catch (error) {
+        schedule(start, CHANGES_RECONNECT_MS);
+      }
+    };
+    
+    start();
+    return {
+      close: () => {
+        closed = true;
+        window.clearTimeout(timer);
+        source?.close();
+      }
+    };
+  }
+};
+
 // API service for documents
 export const documentsApi = {
   // Upload a document for a member